@@ -0,0 +1,80 @@
+import os
+from datetime import timedelta
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request
+from app.schemas import BestDatesRequest, BestDatesResponse, RankedDate
+from app.services import geocoding, metrics, weather_nasa, power_cache, response_cache
+from app.core import scoring
+
+BEST_DATES_MAX_DAYS = int(os.environ.get("BEST_DATES_MAX_DAYS", 366))
+BEST_DATES_MAX_RESULTS = int(os.environ.get("BEST_DATES_MAX_RESULTS", 50))
+
+router = APIRouter()
+
+@router.post("/best-dates", response_model=BestDatesResponse)
+async def find_best_dates(request: BestDatesRequest, http_request: Request):
+    if request.end < request.start:
+        raise HTTPException(status_code=422, detail="The end date must not be before the start date.")
+    if (request.end - request.start).days + 1 > BEST_DATES_MAX_DAYS:
+        raise HTTPException(status_code=413, detail=f"A scan can cover at most {BEST_DATES_MAX_DAYS} days.")
+    if not 1 <= request.top_k <= BEST_DATES_MAX_RESULTS:
+        raise HTTPException(status_code=422, detail=f"top_k must be between 1 and {BEST_DATES_MAX_RESULTS}.")
+    weekdays = sorted(set(request.weekdays)) if request.weekdays is not None else list(range(7))
+    if not weekdays or any(day not in range(7) for day in weekdays):
+        raise HTTPException(status_code=422, detail="weekdays must contain numbers from 0 (Monday) to 6 (Sunday).")
+
+    candidates = [
+        day for day in (request.start + timedelta(days=i) for i in range((request.end - request.start).days + 1))
+        if day.weekday() in weekdays
+    ]
+    if not candidates:
+        raise HTTPException(status_code=422, detail="No dates in the range fall on the requested weekdays.")
+
+    coords = await geocoding.get_coords_from_location(request.location)
+    if not coords:
+        raise HTTPException(status_code=404, detail="Location not found or geocoding service unavailable.")
+
+    async def compute():
+        try:
+            matrix, summarize = await weather_nasa.sweep_dates(coords['latitude'], coords['longitude'], candidates)
+        except Exception as e:
+            print(f"NASA POWER Error: {e}")
+            raise HTTPException(status_code=502, detail="NASA POWER data is currently unavailable.")
+
+        with metrics.span("scoring"):
+            scores = scoring.score_matrix(matrix, [request.activity])[:, 0]
+            order = np.lexsort((np.arange(len(candidates)), matrix[:, 2], -scores))[:request.top_k]
+
+        best_dates = []
+        for i in order.tolist():
+            weather = summarize(i)
+            score = int(scores[i])
+            best_dates.append(RankedDate(
+                date=candidates[i],
+                score=score,
+                classification=scoring.CLASSIFICATIONS.get(score, "Unknown"),
+                weather_data=weather,
+                probabilities=weather_nasa.calculate_extreme_probabilities(weather)
+            ))
+
+        with metrics.span("validation"):
+            response = BestDatesResponse(
+                location=request.location,
+                activity=request.activity,
+                dates_scanned=len(candidates),
+                best_dates=best_dates
+            )
+            return response.model_dump(mode="json"), not any(ranked.weather_data.stale for ranked in best_dates)
+
+    key = response_cache.make_key(
+        "best_dates",
+        power_cache.grid_cell(coords['latitude'], coords['longitude']),
+        request.start,
+        request.end,
+        tuple(weekdays),
+        request.top_k,
+        weather_nasa.SEASONAL_WINDOW_DAYS,
+        request.activity
+    )
+    payload, cacheable, stale = await response_cache.get_or_compute(key, compute)
+    return response_cache.respond(http_request, {**payload, "location": request.location}, cacheable, stale)
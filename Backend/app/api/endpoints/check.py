@@ -1,50 +1,140 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas import CheckRequest, CheckResponse
-from app.services import geocoding, weather_nasa
+import asyncio
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.schemas import CheckRequest, CheckResponse, BatchCheckRequest, BatchCheckResponse, BatchCheckItem
+from app.services import geocoding, metrics, weather_nasa, power_cache, response_cache
 from app.core import scoring
 
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", 500))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", 8))
+
 router = APIRouter()
 
 @router.post("/check", response_model=CheckResponse)
-def check_weather_suitability(request: CheckRequest):
-    coords = geocoding.get_coords_from_location(request.location)
+async def check_weather_suitability(request: CheckRequest, http_request: Request):
+    return await _cached_check(request, http_request)
+
+@router.get("/check", response_model=CheckResponse)
+async def check_weather_suitability_query(http_request: Request, request: CheckRequest = Depends()):
+    return await _cached_check(request, http_request)
+
+async def _cached_check(request: CheckRequest, http_request: Request):
+    coords = await geocoding.get_coords_from_location(request.location)
     if not coords:
         raise HTTPException(status_code=404, detail="Location not found or geocoding service unavailable.")
 
-    historical_weather = weather_nasa.get_historical_weather(
-        lat=coords['latitude'], 
-        lon=coords['longitude'],
-        event_date=request.date
+    async def compute():
+        historical_weather = await weather_nasa.get_historical_weather(
+            lat=coords['latitude'],
+            lon=coords['longitude'],
+            event_date=request.date
+        )
+        response = _build_check_response(request, historical_weather)
+        with metrics.span("validation"):
+            payload = response.model_dump(mode="json")
+        return payload, historical_weather["data_source"] != "fallback" and not historical_weather.get("stale")
+
+    key = response_cache.make_key(
+        "check",
+        power_cache.grid_cell(coords['latitude'], coords['longitude']),
+        request.date,
+        weather_nasa.SEASONAL_WINDOW_DAYS,
+        request.activity
     )
-    
+    payload, cacheable, stale = await response_cache.get_or_compute(key, compute)
+    return response_cache.respond(http_request, {**payload, "request_data": request.model_dump(mode="json")}, cacheable, stale)
+
+@router.post("/check/batch", response_model=BatchCheckResponse)
+async def check_weather_suitability_batch(request: BatchCheckRequest):
+    if len(request.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch can contain at most {BATCH_MAX_ITEMS} requests.")
+
+    limit = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def resolve(location: str):
+        async with limit:
+            return await geocoding.get_coords_from_location(location)
+
+    async def fetch(coords: dict, dates: list):
+        async with limit:
+            return await weather_nasa.get_historical_weather_batch(
+                lat=coords['latitude'],
+                lon=coords['longitude'],
+                event_dates=dates
+            )
+
+    locations = list(dict.fromkeys(item.location for item in request.requests))
+    coords_by_location = dict(zip(locations, await asyncio.gather(*(resolve(location) for location in locations))))
+
+    cells = {}
+    for item in request.requests:
+        coords = coords_by_location[item.location]
+        if coords:
+            cell = power_cache.grid_cell(coords['latitude'], coords['longitude'])
+            cells.setdefault(cell, (coords, {}))[1].setdefault(item.date, None)
+
+    fetched = await asyncio.gather(*(fetch(coords, list(weather_by_date)) for coords, weather_by_date in cells.values()))
+    for (_, weather_by_date), weather_list in zip(cells.values(), fetched):
+        for event_date, weather in zip(list(weather_by_date), weather_list):
+            weather_by_date[event_date] = weather
+
+    weather_by_item = {}
+    for i, item in enumerate(request.requests):
+        coords = coords_by_location[item.location]
+        if coords:
+            weather_by_item[i] = cells[power_cache.grid_cell(coords['latitude'], coords['longitude'])][1][item.date]
+
+    with metrics.span("scoring"):
+        scores = dict(zip(weather_by_item, scoring.score_pairs(
+            list(weather_by_item.values()),
+            [request.requests[i].activity for i in weather_by_item]
+        )))
+
+    results = []
+    for i, item in enumerate(request.requests):
+        if i not in weather_by_item:
+            results.append(BatchCheckItem(error="Location not found or geocoding service unavailable."))
+            continue
+
+        try:
+            results.append(BatchCheckItem(result=_build_check_response(item, weather_by_item[i], scores[i])))
+        except Exception as e:
+            results.append(BatchCheckItem(error=str(e)))
+
+    return BatchCheckResponse(results=results)
+
+def _build_check_response(request: CheckRequest, historical_weather: dict, final_score: Optional[int] = None) -> CheckResponse:
     probabilities = weather_nasa.calculate_extreme_probabilities(historical_weather)
 
-    final_score = scoring.calculate_suitability_score(
-        weather_data=historical_weather,
-        activity=request.activity
-    )
+    if final_score is None:
+        with metrics.span("scoring"):
+            final_score = scoring.calculate_suitability_score(
+                weather_data=historical_weather,
+                activity=request.activity
+            )
+
+    classification_text = scoring.CLASSIFICATIONS.get(final_score, "Unknown")
 
-    classifications = {1: "Not Recommended", 2: "Poor", 3: "Fair", 4: "Good", 5: "Excellent"}
-    classification_text = classifications.get(final_score, "Unknown")
-    
     recommendations = scoring.get_recommendations(
         weather_data=historical_weather,
         activity=request.activity,
         probabilities=probabilities
     )
-    
+
     justification = scoring.generate_justification(
         weather_data=historical_weather,
         activity=request.activity,
         score=final_score
     )
 
-    return CheckResponse(
-        score=final_score,
-        classification=classification_text,
-        justification=justification,
-        weather_data=historical_weather,
-        request_data=request,
-        probabilities=probabilities,
-        recommendations=recommendations
-    )
\ No newline at end of file
+    with metrics.span("validation"):
+        return CheckResponse(
+            score=final_score,
+            classification=classification_text,
+            justification=justification,
+            weather_data=historical_weather,
+            request_data=request,
+            probabilities=probabilities,
+            recommendations=recommendations
+        )
\ No newline at end of file
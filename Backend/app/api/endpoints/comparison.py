@@ -1,45 +1,69 @@
+import asyncio
+import os
 from fastapi import APIRouter, HTTPException
 from app.schemas import LocationComparisonRequest, ComparisonResponse, LocationData
-from app.services import geocoding, weather_nasa
+from app.services import geocoding, metrics, weather_nasa, power_cache
 from app.core import scoring
 from typing import List
 
+COMPARE_MAX_CONCURRENCY = int(os.environ.get("COMPARE_MAX_CONCURRENCY", 8))
+
 router = APIRouter()
 
 @router.post("/compare", response_model=ComparisonResponse)
-def compare_locations(request: LocationComparisonRequest):
+async def compare_locations(request: LocationComparisonRequest):
+    limit = asyncio.Semaphore(COMPARE_MAX_CONCURRENCY)
+
+    async def resolve(location: str):
+        async with limit:
+            return await geocoding.get_coords_from_location(location)
+
+    async def fetch(coords: dict):
+        async with limit:
+            return await weather_nasa.get_historical_weather(
+                lat=coords['latitude'],
+                lon=coords['longitude'],
+                event_date=request.date
+            )
+
+    resolved = await asyncio.gather(*(resolve(location) for location in request.locations))
+
+    cells = {}
+    for coords in resolved:
+        if coords:
+            cells.setdefault(power_cache.grid_cell(coords['latitude'], coords['longitude']), coords)
+
+    fetched = await asyncio.gather(*(fetch(coords) for coords in cells.values()))
+    weather_by_cell = dict(zip(cells, fetched))
+
     comparison_data: List[LocationData] = []
-    
-    for location in request.locations:
-        coords = geocoding.get_coords_from_location(location)
+
+    for location, coords in zip(request.locations, resolved):
         if not coords:
             continue
-        
-        weather = weather_nasa.get_historical_weather(
-            lat=coords['latitude'],
-            lon=coords['longitude'],
-            event_date=request.date
-        )
-        
+
+        weather = weather_by_cell[power_cache.grid_cell(coords['latitude'], coords['longitude'])]
+
         probabilities = weather_nasa.calculate_extreme_probabilities(weather)
-        
-        score = scoring.calculate_suitability_score(
-            weather_data=weather,
-            activity=request.activity
-        )
-        
+
+        with metrics.span("scoring"):
+            score = scoring.calculate_suitability_score(
+                weather_data=weather,
+                activity=request.activity
+            )
+
         comparison_data.append(LocationData(
             location=location,
             score=score,
             weather_data=weather,
             probabilities=probabilities
         ))
-    
+
     if not comparison_data:
         raise HTTPException(status_code=404, detail="No valid locations found")
-    
+
     best_location = max(comparison_data, key=lambda x: x.score).location
-    
+
     return ComparisonResponse(
         best_location=best_location,
         comparison_data=sorted(comparison_data, key=lambda x: x.score, reverse=True),
@@ -1,23 +1,29 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
-from app.schemas import CheckRequest
-from app.services import geocoding, weather_nasa
+from app.schemas import CheckRequest, DailyExportRequest
+from app.services import geocoding, series_export, weather_nasa
+import asyncio
 import csv
 import json
+import os
+from datetime import date, timedelta
 from io import StringIO
 
+EXPORT_MAX_LOCATIONS = int(os.environ.get("EXPORT_MAX_LOCATIONS", 50))
+
 router = APIRouter()
 
 @router.post("/export/csv")
-def export_csv(request: CheckRequest):
-    coords = geocoding.get_coords_from_location(request.location)
+async def export_csv(request: CheckRequest):
+    coords = await geocoding.get_coords_from_location(request.location)
     if not coords:
         raise HTTPException(status_code=404, detail="Location not found")
 
-    weather = weather_nasa.get_historical_weather(
+    weather = await weather_nasa.get_historical_weather(
         lat=coords['latitude'], 
         lon=coords['longitude'],
-        event_date=request.date
+        event_date=request.date,
+        use_climatology=False
     )
     
     output = StringIO()
@@ -45,15 +51,16 @@ def export_csv(request: CheckRequest):
     )
 
 @router.post("/export/json")
-def export_json(request: CheckRequest):
-    coords = geocoding.get_coords_from_location(request.location)
+async def export_json(request: CheckRequest):
+    coords = await geocoding.get_coords_from_location(request.location)
     if not coords:
         raise HTTPException(status_code=404, detail="Location not found")
 
-    weather = weather_nasa.get_historical_weather(
+    weather = await weather_nasa.get_historical_weather(
         lat=coords['latitude'], 
         lon=coords['longitude'],
-        event_date=request.date
+        event_date=request.date,
+        use_climatology=False
     )
     
     export_data = {
@@ -63,11 +70,59 @@ def export_json(request: CheckRequest):
             "date": str(request.date),
             "activity": request.activity
         },
-        "weather_data": weather
+        "weather_data": weather_nasa.weather_data_for_export(weather)
     }
     
     return StreamingResponse(
         iter([json.dumps(export_data, indent=2)]),
         media_type="application/json",
         headers={"Content-Disposition": f"attachment; filename=weather_{request.location}_{request.date}.json"}
-    )
\ No newline at end of file
+    )
+
+@router.post("/export/daily")
+async def export_daily(request: DailyExportRequest):
+    if request.format not in series_export.FORMATS:
+        raise HTTPException(status_code=422, detail=f"Unknown format '{request.format}'. Use one of: {', '.join(series_export.FORMATS)}")
+    if request.format in series_export.COLUMNAR_FORMATS and not series_export.columnar_available():
+        raise HTTPException(status_code=501, detail="Arrow and Parquet exports require the optional pyarrow package.")
+    if not request.locations:
+        raise HTTPException(status_code=422, detail="At least one location is required.")
+    if len(request.locations) > EXPORT_MAX_LOCATIONS:
+        raise HTTPException(status_code=413, detail=f"An export can contain at most {EXPORT_MAX_LOCATIONS} locations.")
+    if request.end < request.start:
+        raise HTTPException(status_code=422, detail="The end date must not be before the start date.")
+    end = min(request.end, date.today() - timedelta(days=weather_nasa.POWER_PUBLICATION_LAG_DAYS))
+    if end < request.start:
+        raise HTTPException(status_code=422, detail=f"NASA POWER publishes daily data about {weather_nasa.POWER_PUBLICATION_LAG_DAYS} days late; the export range must start on or before {end.isoformat()}.")
+
+    parameters = request.parameters or weather_nasa.DAILY_PARAMETERS
+    unknown = [name for name in parameters if name not in weather_nasa.DAILY_PARAMETERS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown parameters: {', '.join(unknown)}. Use any of: {', '.join(weather_nasa.DAILY_PARAMETERS)}")
+
+    locations = list(dict.fromkeys(request.locations))
+    coords_by_location = dict(zip(locations, await asyncio.gather(*(geocoding.get_coords_from_location(location) for location in locations))))
+    missing = [location for location, coords in coords_by_location.items() if not coords]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Location not found: {', '.join(missing)}")
+
+    places = [(location, coords['latitude'], coords['longitude']) for location, coords in coords_by_location.items()]
+    stream = series_export.stream_daily_series(places, request.start, end, parameters, request.format)
+    try:
+        first = await stream.__anext__()
+    except Exception as e:
+        await stream.aclose()
+        print(f"Export error: {e}")
+        raise HTTPException(status_code=502, detail="NASA POWER data is currently unavailable.")
+
+    async def body():
+        yield first
+        async for block in stream:
+            yield block
+
+    media_type, extension = series_export.FORMATS[request.format]
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=weather_daily_{request.start}_{end}.{extension}"}
+    )
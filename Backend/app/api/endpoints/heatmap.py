@@ -0,0 +1,38 @@
+from datetime import date
+from fastapi import APIRouter, HTTPException, Response
+from app.services import heatmap, metrics
+
+router = APIRouter()
+
+FORMATS = ["bin", "json"]
+
+@router.get("/heatmap")
+async def get_heatmap(south: float, west: float, north: float, east: float, date: date, activity: str, format: str = "bin"):
+    if format not in FORMATS:
+        raise HTTPException(status_code=422, detail=f"Unknown format '{format}'. Use one of: {', '.join(FORMATS)}")
+    if not (-90 <= south <= north <= 90) or not (-180 <= west <= east <= 180):
+        raise HTTPException(status_code=422, detail="The bounding box must satisfy -90 <= south <= north <= 90 and -180 <= west <= east <= 180.")
+    if heatmap.cell_count(south, west, north, east) > heatmap.HEATMAP_MAX_CELLS:
+        raise HTTPException(status_code=413, detail=f"The bounding box covers more than {heatmap.HEATMAP_MAX_CELLS} grid cells. Zoom in or split the request.")
+
+    grid = await heatmap.score_grid(south, west, north, east, date, activity)
+    if not grid["cells_with_data"]:
+        raise HTTPException(status_code=502, detail="NASA POWER data is currently unavailable.")
+
+    headers = {
+        "X-Grid-North": str(grid["north"]),
+        "X-Grid-West": str(grid["west"]),
+        "X-Grid-Lat-Resolution": str(grid["lat_resolution"]),
+        "X-Grid-Lon-Resolution": str(grid["lon_resolution"]),
+        "X-Grid-Rows": str(grid["rows"]),
+        "X-Grid-Cols": str(grid["cols"]),
+        "Access-Control-Expose-Headers": "X-Grid-North, X-Grid-West, X-Grid-Lat-Resolution, X-Grid-Lon-Resolution, X-Grid-Rows, X-Grid-Cols"
+    }
+
+    with metrics.span("serialization"):
+        if format == "json":
+            return {
+                **{key: grid[key] for key in ("north", "west", "lat_resolution", "lon_resolution", "rows", "cols")},
+                "scores": grid["scores"].tolist()
+            }
+        return Response(grid["scores"].tobytes(), media_type="application/octet-stream", headers=headers)
@@ -1,21 +1,65 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas import CheckRequest, ExtremeProbabilities
-from app.services import geocoding, weather_nasa
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.schemas import CheckRequest, ExtremeProbabilities, ThresholdProbabilityRequest, ThresholdProbability
+from app.services import geocoding, weather_nasa, power_cache, response_cache
+from app.core import exceedance
+from typing import List
 
 router = APIRouter()
 
 @router.post("/probabilities", response_model=ExtremeProbabilities)
-def get_weather_probabilities(request: CheckRequest):
-    coords = geocoding.get_coords_from_location(request.location)
+async def get_weather_probabilities(request: CheckRequest, http_request: Request):
+    return await _cached_probabilities(request, http_request)
+
+@router.get("/probabilities", response_model=ExtremeProbabilities)
+async def get_weather_probabilities_query(http_request: Request, request: CheckRequest = Depends()):
+    return await _cached_probabilities(request, http_request)
+
+async def _cached_probabilities(request: CheckRequest, http_request: Request):
+    coords = await geocoding.get_coords_from_location(request.location)
     if not coords:
         raise HTTPException(status_code=404, detail="Location not found")
 
-    weather = weather_nasa.get_historical_weather(
-        lat=coords['latitude'], 
+    async def compute():
+        weather = await weather_nasa.get_historical_weather(
+            lat=coords['latitude'], 
+            lon=coords['longitude'],
+            event_date=request.date
+        )
+        probabilities = weather_nasa.calculate_extreme_probabilities(weather)
+        return ExtremeProbabilities(**probabilities).model_dump(mode="json"), weather["data_source"] != "fallback" and not weather.get("stale")
+
+    key = response_cache.make_key(
+        "probabilities",
+        power_cache.grid_cell(coords['latitude'], coords['longitude']),
+        request.date,
+        weather_nasa.SEASONAL_WINDOW_DAYS
+    )
+    payload, cacheable, stale = await response_cache.get_or_compute(key, compute)
+    return response_cache.respond(http_request, payload, cacheable, stale)
+
+@router.post("/probabilities/custom", response_model=List[ThresholdProbability])
+async def get_threshold_probabilities(request: ThresholdProbabilityRequest):
+    for query in request.thresholds:
+        if query.metric not in weather_nasa.THRESHOLD_METRICS:
+            raise HTTPException(status_code=422, detail=f"Unknown metric '{query.metric}'. Use one of: {', '.join(weather_nasa.THRESHOLD_METRICS)}")
+        if query.operator not in (">", "<"):
+            raise HTTPException(status_code=422, detail="Operator must be '>' or '<'")
+    if request.mode is not None and request.mode not in exceedance.MODES:
+        raise HTTPException(status_code=422, detail=f"Mode must be one of: {', '.join(exceedance.MODES)}")
+
+    coords = await geocoding.get_coords_from_location(request.location)
+    if not coords:
+        raise HTTPException(status_code=404, detail="Location not found")
+
+    weather = await weather_nasa.get_historical_weather(
+        lat=coords['latitude'],
         lon=coords['longitude'],
-        event_date=request.date
+        event_date=request.date,
+        use_climatology=False
+    )
+
+    return weather_nasa.calculate_threshold_probabilities(
+        weather,
+        [(query.metric, query.operator, query.threshold) for query in request.thresholds],
+        mode=request.mode
     )
-    
-    probabilities = weather_nasa.calculate_extreme_probabilities(weather)
-    
-    return probabilities
\ No newline at end of file
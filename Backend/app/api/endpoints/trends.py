@@ -1,21 +1,32 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date
+from fastapi import APIRouter, HTTPException, Request
 from app.schemas import ClimateTrendsResponse
-from app.services import geocoding, weather_nasa
+from app.services import geocoding, weather_nasa, power_cache, response_cache
 
 router = APIRouter()
 
 @router.get("/trends/{location}", response_model=ClimateTrendsResponse)
-def get_climate_trends(location: str, start_year: int = 2014, end_year: int = 2023):
-    coords = geocoding.get_coords_from_location(location)
+async def get_climate_trends(location: str, http_request: Request, start_year: int = 2014, end_year: int = 2023):
+    coords = await geocoding.get_coords_from_location(location)
     if not coords:
         raise HTTPException(status_code=404, detail="Location not found")
     
-    trends = weather_nasa.get_climate_trends(
-        lat=coords['latitude'],
-        lon=coords['longitude'],
-        location=location,
-        start_year=start_year,
-        end_year=end_year
+    async def compute():
+        trends = await weather_nasa.get_climate_trends(
+            lat=coords['latitude'],
+            lon=coords['longitude'],
+            location=location,
+            start_year=start_year,
+            end_year=end_year
+        )
+        return ClimateTrendsResponse(**trends).model_dump(mode="json"), trends["trend_direction"] != "insufficient_data"
+
+    key = response_cache.make_key(
+        "trends",
+        power_cache.grid_cell(coords['latitude'], coords['longitude']),
+        start_year,
+        end_year,
+        min(date(end_year, 12, 31), date.today())
     )
-    
-    return trends
\ No newline at end of file
+    payload, cacheable, stale = await response_cache.get_or_compute(key, compute)
+    return response_cache.respond(http_request, payload, cacheable, stale)
\ No newline at end of file
@@ -0,0 +1,47 @@
+import argparse
+import asyncio
+from datetime import date
+
+from app.services import climatology, geocoding, http_client, power_cache, weather_nasa
+
+async def build(locations, coords, start_year: int, end_year: int, window_days: int):
+    points = list(coords)
+    for location in locations:
+        resolved = await geocoding.get_coords_from_location(location)
+        if not resolved:
+            print(f"Skipping {location}: location not found")
+            continue
+        points.append((resolved["latitude"], resolved["longitude"]))
+
+    cells = dict.fromkeys(power_cache.grid_cell(lat, lon) for lat, lon in points)
+    climatology.write_manifest(weather_nasa.DAILY_PARAMETERS, window_days, start_year, end_year)
+
+    try:
+        for cell in cells:
+            history = await weather_nasa.get_daily_series(cell[0], cell[1], *climatology.history_span(start_year, end_year, window_days))
+            table = climatology.compute_table(history, weather_nasa.DAILY_PARAMETERS, window_days, start_year, end_year)
+            climatology.write_table(cell, table, start_year, end_year)
+            print(f"Built climatology for cell {cell[0]}, {cell[1]}")
+    finally:
+        await http_client.close()
+
+def _parse_coords(value: str):
+    lat, lon = value.split(",")
+    return float(lat), float(lon)
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute per-cell day-of-year climatology from NASA POWER data")
+    parser.add_argument("--location", action="append", default=[], help="Place name to geocode (repeatable)")
+    parser.add_argument("--coords", action="append", default=[], type=_parse_coords, help="LAT,LON pair (repeatable)")
+    parser.add_argument("--start-year", type=int, default=date.today().year - 10)
+    parser.add_argument("--end-year", type=int, default=date.today().year - 1)
+    parser.add_argument("--window-days", type=int, default=weather_nasa.SEASONAL_WINDOW_DAYS)
+    args = parser.parse_args()
+
+    if not args.location and not args.coords:
+        parser.error("at least one --location or --coords is required")
+
+    asyncio.run(build(args.location, args.coords, args.start_year, args.end_year, args.window_days))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import math
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+
+PROBABILITY_MODE = os.environ.get("PROBABILITY_MODE", "empirical")
+MODES = ["empirical", "normal"]
+
+def empirical(sorted_values: np.ndarray, op: str, thresholds: Sequence[float]) -> np.ndarray:
+    n = len(sorted_values)
+    if n == 0:
+        return np.full(len(thresholds), np.nan)
+
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    if op == ">":
+        counts = n - np.searchsorted(sorted_values, thresholds, side="right")
+    else:
+        counts = np.searchsorted(sorted_values, thresholds, side="left")
+    return counts / n * 100
+
+def normal(mean: float, std: float, op: str, thresholds: Sequence[float]) -> np.ndarray:
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    if std > 0:
+        z = (thresholds - mean) / (std * math.sqrt(2))
+        cdf = 0.5 * (1 + np.array([math.erf(value) for value in z.tolist()]))
+    else:
+        cdf = (thresholds >= mean).astype(np.float64)
+    return (1 - cdf) * 100 if op == ">" else cdf * 100
+
+def exceedance_probabilities(source, name: str, op: str, thresholds: Sequence[float], mode: Optional[str] = None) -> np.ndarray:
+    mode = mode or PROBABILITY_MODE
+
+    if mode == "empirical":
+        if hasattr(source, "sorted_values"):
+            return empirical(source.sorted_values(name), op, thresholds)
+        if hasattr(source, "exceedance_count"):
+            counts = [source.exceedance_count(name, op, threshold) for threshold in thresholds]
+            if all(count is not None for count in counts) and source.count(name):
+                return np.array(counts, dtype=np.float64) / source.count(name) * 100
+
+    return normal(source.mean(name), source.std(name), op, thresholds)
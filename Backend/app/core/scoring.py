@@ -1,94 +1,136 @@
-from typing import List
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 
-def calculate_suitability_score(weather_data: dict, activity: str):
-    weights = {
-        "Hiking": {"temp": 0.30, "precip": 0.30, "wind": 0.25, "humidity": 0.10, "cloud": 0.05},
-        "Cycling": {"temp": 0.20, "precip": 0.30, "wind": 0.35, "humidity": 0.10, "cloud": 0.05},
-        "Picnic": {"temp": 0.15, "precip": 0.40, "wind": 0.35, "humidity": 0.05, "cloud": 0.05},
-        "Running / Outdoor Sports": {"temp": 0.40, "precip": 0.15, "wind": 0.10, "humidity": 0.30, "cloud": 0.05},
-        "Outdoor Market": {"temp": 0.20, "precip": 0.35, "wind": 0.40, "humidity": 0.02, "cloud": 0.03},
-        "Beach": {"temp": 0.35, "precip": 0.30, "wind": 0.15, "humidity": 0.10, "cloud": 0.10},
-        "Camping": {"temp": 0.25, "precip": 0.35, "wind": 0.20, "humidity": 0.10, "cloud": 0.10},
-        "Festival": {"temp": 0.20, "precip": 0.40, "wind": 0.25, "humidity": 0.10, "cloud": 0.05}
+ACTIVITY_WEIGHTS = {
+    "Hiking": {"temp": 0.30, "precip": 0.30, "wind": 0.25, "humidity": 0.10, "cloud": 0.05},
+    "Cycling": {"temp": 0.20, "precip": 0.30, "wind": 0.35, "humidity": 0.10, "cloud": 0.05},
+    "Picnic": {"temp": 0.15, "precip": 0.40, "wind": 0.35, "humidity": 0.05, "cloud": 0.05},
+    "Running / Outdoor Sports": {"temp": 0.40, "precip": 0.15, "wind": 0.10, "humidity": 0.30, "cloud": 0.05},
+    "Outdoor Market": {"temp": 0.20, "precip": 0.35, "wind": 0.40, "humidity": 0.02, "cloud": 0.03},
+    "Beach": {"temp": 0.35, "precip": 0.30, "wind": 0.15, "humidity": 0.10, "cloud": 0.10},
+    "Camping": {"temp": 0.25, "precip": 0.35, "wind": 0.20, "humidity": 0.10, "cloud": 0.10},
+    "Festival": {"temp": 0.20, "precip": 0.40, "wind": 0.25, "humidity": 0.10, "cloud": 0.05}
+}
+ACTIVITIES = list(ACTIVITY_WEIGHTS)
+CLASSIFICATIONS = {1: "Not Recommended", 2: "Poor", 3: "Fair", 4: "Good", 5: "Excellent"}
+METRICS = ["temp", "precip", "wind", "humidity", "cloud"]
+
+def _above(x: float) -> float:
+    return float(np.nextafter(x, np.inf))
+
+def _table(edges: List[float], scores: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    return np.array(edges, dtype=np.float64), np.array(scores, dtype=np.int8)
+
+# Bin edges are left-closed; _above(x) turns an edge into "greater than x".
+SCORE_TABLES = {
+    "temp": {
+        "default": _table([5, 8, 12, 18, _above(24), _above(28), _above(32), _above(35)], [1, 2, 3, 4, 5, 4, 3, 2, 1]),
+        "beach": _table([18, 20, 22, 25, _above(32), _above(35), _above(38)], [1, 2, 3, 4, 5, 4, 2, 1])
+    },
+    "precip": {
+        "default": _table([0, _above(0), _above(0.5), _above(1.5), _above(2.5)], [4, 5, 4, 3, 2, 1])
+    },
+    "wind": {
+        "default": _table([10, 20, 30, 40], [5, 4, 3, 2, 1]),
+        "cycling": _table([5, 15, 25, 35], [5, 4, 3, 2, 1])
+    },
+    "humidity": {
+        "default": _table([30, 40, _above(60), _above(70), _above(80)], [2, 4, 5, 4, 3, 2]),
+        "active": _table([20, 30, _above(50), _above(60), _above(70), _above(80)], [1, 3, 5, 4, 3, 2, 1])
+    },
+    "cloud": {
+        "default": _table([20, _above(50)], [3, 5, 3])
     }
+}
 
-    temp = weather_data["avg_temp_c"]
-    temp_max = weather_data.get("max_temp_c", temp + 5)
-    precip = weather_data["avg_precipitation_mmhr"]
-    wind = weather_data["avg_wind_speed_kmh"]
-    humidity = weather_data["avg_humidity_percent"]
-    cloud = weather_data["avg_cloud_cover_percent"]
-
-    if precip > 2.5 or wind > 40 or temp_max > 40 or temp < 0:
-        return 1
-
-    def get_temp_score(t, activity_type):
-        if activity_type in ["Beach", "Swimming"]:
-            if 25 <= t <= 32: return 5
-            if 22 <= t < 25 or 32 < t <= 35: return 4
-            if 20 <= t < 22: return 3
-            if 18 <= t < 20 or 35 < t <= 38: return 2
-            return 1
-        else:
-            if 18 <= t <= 24: return 5
-            if 12 <= t < 18 or 24 < t <= 28: return 4
-            if 8 <= t < 12 or 28 < t <= 32: return 3
-            if 5 <= t < 8 or 32 < t <= 35: return 2
-            return 1
-
-    def get_precip_score(p):
-        if p == 0: return 5
-        if p <= 0.5: return 4
-        if p <= 1.5: return 3
-        if p <= 2.5: return 2
-        return 1
-        
-    def get_wind_score(w, activity_type):
-        if activity_type == "Cycling":
-            if w < 5: return 5
-            if w < 15: return 4
-            if w < 25: return 3
-            if w < 35: return 2
-            return 1
-        else:
-            if w < 10: return 5
-            if w < 20: return 4
-            if w < 30: return 3
-            if w < 40: return 2
-            return 1
-    
-    def get_humidity_score(h, activity_type):
-        if activity_type in ["Running / Outdoor Sports", "Cycling"]:
-            if 30 <= h <= 50: return 5
-            if 50 < h <= 60: return 4
-            if 60 < h <= 70 or 20 <= h < 30: return 3
-            if 70 < h <= 80: return 2
-            return 1
-        else:
-            if 40 <= h <= 60: return 5
-            if 30 <= h < 40 or 60 < h <= 70: return 4
-            if 70 < h <= 80: return 3
-            return 2
-
-    scores = {
-        "temp": get_temp_score(temp, activity),
-        "precip": get_precip_score(precip),
-        "wind": get_wind_score(wind, activity),
-        "humidity": get_humidity_score(humidity, activity),
-        "cloud": 5 if 20 <= cloud <= 50 else 3
+_SCALAR_TABLES = {
+    (metric, profile): (edges.tolist(), scores.tolist())
+    for metric, profiles in SCORE_TABLES.items()
+    for profile, (edges, scores) in profiles.items()
+}
+
+def _profile(metric: str, activity: str) -> str:
+    if metric == "temp" and activity in ["Beach", "Swimming"]:
+        return "beach"
+    if metric == "wind" and activity == "Cycling":
+        return "cycling"
+    if metric == "humidity" and activity in ["Running / Outdoor Sports", "Cycling"]:
+        return "active"
+    return "default"
+
+def weather_matrix(weather_data_list: List[dict]) -> np.ndarray:
+    rows = []
+    for weather_data in weather_data_list:
+        temp = weather_data["avg_temp_c"]
+        rows.append([
+            temp,
+            weather_data.get("max_temp_c", temp + 5),
+            weather_data["avg_precipitation_mmhr"],
+            weather_data["avg_wind_speed_kmh"],
+            weather_data["avg_humidity_percent"],
+            weather_data["avg_cloud_cover_percent"]
+        ])
+    return np.array(rows, dtype=np.float64).reshape(-1, 6)
+
+def score_matrix(weather: np.ndarray, activities: List[str]) -> np.ndarray:
+    temp, temp_max, precip, wind, humidity, cloud = weather.T
+    values = {"temp": temp, "precip": precip, "wind": wind, "humidity": humidity, "cloud": cloud}
+
+    metric_scores = {}
+    for metric, profiles in SCORE_TABLES.items():
+        for profile, (edges, scores) in profiles.items():
+            metric_scores[metric, profile] = scores[np.digitize(values[metric], edges)]
+
+    final = np.zeros((len(weather), len(activities)), dtype=np.float64)
+    for j, activity in enumerate(activities):
+        weights = ACTIVITY_WEIGHTS.get(activity, ACTIVITY_WEIGHTS["Hiking"])
+        for metric in METRICS:
+            final[:, j] += metric_scores[metric, _profile(metric, activity)] * weights[metric]
+
+    scores = np.round(final).astype(np.int64)
+    unsafe = (precip > 2.5) | (wind > 40) | (temp_max > 40) | (temp < 0)
+    scores[unsafe] = 1
+    return scores
+
+def score_activities(weather_data_list: List[dict], activities: List[str]) -> np.ndarray:
+    return score_matrix(weather_matrix(weather_data_list), activities)
+
+def score_pairs(weather_data_list: List[dict], activities: List[str]) -> List[int]:
+    unique = list(dict.fromkeys(activities))
+    matrix = score_activities(weather_data_list, unique)
+    columns = [unique.index(activity) for activity in activities]
+    return matrix[np.arange(len(activities)), columns].tolist()
+
+def _scalar_values(weather_data: dict) -> Tuple[Dict[str, float], bool]:
+    temp = float(weather_data["avg_temp_c"])
+    values = {
+        "temp": temp,
+        "precip": float(weather_data["avg_precipitation_mmhr"]),
+        "wind": float(weather_data["avg_wind_speed_kmh"]),
+        "humidity": float(weather_data["avg_humidity_percent"]),
+        "cloud": float(weather_data["avg_cloud_cover_percent"])
     }
-    
-    activity_weights = weights.get(activity, weights["Hiking"])
-    
-    final_score = (
-        scores["temp"] * activity_weights["temp"] +
-        scores["precip"] * activity_weights["precip"] +
-        scores["wind"] * activity_weights["wind"] +
-        scores["humidity"] * activity_weights["humidity"] +
-        scores["cloud"] * activity_weights["cloud"]
-    )
-    
-    return round(final_score)
+    unsafe = values["precip"] > 2.5 or values["wind"] > 40 or float(weather_data.get("max_temp_c", temp + 5)) > 40 or temp < 0
+    return values, unsafe
+
+def _scalar_score(values: Dict[str, float], activity: str) -> int:
+    weights = ACTIVITY_WEIGHTS.get(activity, ACTIVITY_WEIGHTS["Hiking"])
+    total = 0.0
+    for metric in METRICS:
+        edges, scores = _SCALAR_TABLES[metric, _profile(metric, activity)]
+        total += scores[bisect_right(edges, values[metric])] * weights[metric]
+    return round(total)
+
+def rank_activities(weather_data: dict, activities: Optional[List[str]] = None) -> List[Tuple[str, int]]:
+    activities = activities or ACTIVITIES
+    values, unsafe = _scalar_values(weather_data)
+    scores = [1 if unsafe else _scalar_score(values, activity) for activity in activities]
+    return sorted(zip(activities, scores), key=lambda item: item[1], reverse=True)
+
+def calculate_suitability_score(weather_data: dict, activity: str):
+    values, unsafe = _scalar_values(weather_data)
+    return 1 if unsafe else _scalar_score(values, activity)
 
 def get_recommendations(weather_data: dict, activity: str, probabilities: dict) -> List[str]:
     recommendations = []
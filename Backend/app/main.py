@@ -1,11 +1,24 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import check, probabilities, export, trends, comparison
+from fastapi.responses import PlainTextResponse
+from app.api.endpoints import check, probabilities, export, trends, comparison, best_dates, heatmap
+from app.services import http_client, metrics, prefetch, resilience
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_client.start()
+    prefetch.start()
+    yield
+    await prefetch.stop()
+    await http_client.close()
 
 app = FastAPI(
     title="Will It Rain On My Parade API",
     description="Weather suitability checker using NASA data",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -16,11 +29,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    timings = metrics.start_request()
+    resilience.start_request()
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+
+    route = request.scope.get("route")
+    metrics.HTTP_REQUEST_SECONDS.observe(
+        elapsed,
+        method=request.method,
+        handler=route.name if route is not None else "unmatched",
+        status=response.status_code
+    )
+    if metrics.SERVER_TIMING:
+        response.headers["Server-Timing"] = metrics.server_timing(timings, elapsed)
+    return response
+
 app.include_router(check.router, prefix="/api")
 app.include_router(probabilities.router, prefix="/api")
 app.include_router(export.router, prefix="/api")
 app.include_router(trends.router, prefix="/api")
 app.include_router(comparison.router, prefix="/api")
+app.include_router(best_dates.router, prefix="/api")
+app.include_router(heatmap.router, prefix="/api")
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def read_root():
@@ -29,11 +67,17 @@ def read_root():
         "version": "2.0.0",
         "endpoints": [
             "/api/check - Check weather suitability",
+            "/api/check/batch - Check many activity/location/date combinations at once",
             "/api/probabilities - Get weather probabilities",
+            "/api/probabilities/custom - Get probabilities for custom thresholds",
             "/api/trends/{location} - Get climate trends",
             "/api/compare - Compare multiple locations",
+            "/api/best-dates - Rank the best dates in a range for an activity",
+            "/api/heatmap - Suitability scores for the grid cells in a bounding box",
             "/api/export/csv - Export data as CSV",
             "/api/export/json - Export data as JSON",
+            "/api/export/daily - Stream daily history as CSV, NDJSON, Arrow or Parquet",
+            "/metrics - Prometheus metrics",
             "/docs - API documentation"
         ]
     }
\ No newline at end of file
@@ -7,6 +7,13 @@ class CheckRequest(BaseModel):
     location: str
     date: date
 
+class DailyExportRequest(BaseModel):
+    locations: List[str]
+    start: date
+    end: date
+    parameters: Optional[List[str]] = None
+    format: str = "csv"
+
 class TemperatureDistribution(BaseModel):
     mean: float
     std: float
@@ -24,6 +31,22 @@ class ExtremeProbabilities(BaseModel):
     very_windy: ProbabilityDetail
     uncomfortable_humidity: ProbabilityDetail
 
+class ThresholdQuery(BaseModel):
+    metric: str
+    operator: str = ">"
+    threshold: float
+
+class ThresholdProbabilityRequest(CheckRequest):
+    thresholds: List[ThresholdQuery]
+    mode: Optional[str] = None
+
+class ThresholdProbability(BaseModel):
+    metric: str
+    operator: str
+    threshold: float
+    probability: Optional[float]
+    confidence: str
+
 class WeatherData(BaseModel):
     avg_temp_c: float
     min_temp_c: float
@@ -34,6 +57,7 @@ class WeatherData(BaseModel):
     avg_cloud_cover_percent: float
     avg_uv_index: float
     data_source: str
+    stale: bool = False
     years_analyzed: int
     temperature_distribution: TemperatureDistribution
 
@@ -46,6 +70,37 @@ class CheckResponse(BaseModel):
     probabilities: ExtremeProbabilities
     recommendations: List[str]
 
+class BestDatesRequest(BaseModel):
+    activity: str
+    location: str
+    start: date
+    end: date
+    weekdays: Optional[List[int]] = None
+    top_k: int = 5
+
+class RankedDate(BaseModel):
+    date: date
+    score: int
+    classification: str
+    weather_data: WeatherData
+    probabilities: ExtremeProbabilities
+
+class BestDatesResponse(BaseModel):
+    location: str
+    activity: str
+    dates_scanned: int
+    best_dates: List[RankedDate]
+
+class BatchCheckRequest(BaseModel):
+    requests: List[CheckRequest]
+
+class BatchCheckItem(BaseModel):
+    result: Optional[CheckResponse] = None
+    error: Optional[str] = None
+
+class BatchCheckResponse(BaseModel):
+    results: List[BatchCheckItem]
+
 class TrendData(BaseModel):
     year: int
     avg_temp: Optional[float]
@@ -53,6 +108,7 @@ class TrendData(BaseModel):
     extreme_heat_days: int
     extreme_cold_days: int
     heavy_rain_days: int
+    partial: bool = False
 
 class TrendAnalysis(BaseModel):
     temp_change_per_decade: float
@@ -63,7 +119,7 @@ class ClimateTrendsResponse(BaseModel):
     temperature_trend: float
     precipitation_trend: float
     yearly_data: List[TrendData]
-    analysis: TrendAnalysis
+    analysis: Optional[TrendAnalysis] = None
 
 class LocationComparisonRequest(BaseModel):
     locations: List[str]
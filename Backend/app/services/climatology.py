@@ -0,0 +1,202 @@
+import json
+import os
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.weather_series import WeatherSeries, noleap_day_of_year
+
+CLIMATOLOGY_DIR = os.environ.get(
+    "CLIMATOLOGY_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "..", "cache", "climatology")
+)
+STATISTICS = ["count", "mean", "std", "p10", "p25", "p50", "p75", "p90"]
+PERCENTILE_LEVELS = [10, 25, 50, 75, 90]
+EXCEEDANCES = [
+    ("T2M", ">", 32.0),
+    ("T2M", "<", 5.0),
+    ("PRECTOTCORR", ">", 2.0),
+    ("PRECTOTCORR", ">", 10.0),
+    ("WS10M", ">", 30.0 / 3.6),
+    ("RH2M", ">", 75.0)
+]
+CLIMATOLOGY_RECHECK_SECONDS = float(os.environ.get("CLIMATOLOGY_RECHECK_SECONDS", 30))
+DAYS_PER_YEAR = 365
+HISTORY_YEARS = 10
+TABLE_VERSION = 2
+
+_manifests: Dict[Tuple[int, int], tuple] = {}
+_tables: Dict[tuple, tuple] = {}
+
+class ClimatologyRecord:
+    __slots__ = ("parameters", "values", "exceedances")
+
+    def __init__(self, parameters: List[str], values: np.ndarray, exceedances: np.ndarray):
+        self.parameters = parameters
+        self.values = values
+        self.exceedances = exceedances
+
+    def _stat(self, name: str, statistic: str) -> Optional[float]:
+        if name not in self.parameters:
+            return None
+        return float(self.values[self.parameters.index(name), STATISTICS.index(statistic)])
+
+    def count(self, name: str) -> int:
+        return int(self._stat(name, "count") or 0)
+
+    def mean(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        return self._stat(name, "mean") if self.count(name) else default
+
+    def std(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        return self._stat(name, "std") if self.count(name) else default
+
+    def percentiles(self, name: str, levels: Sequence[float], default: Optional[Sequence[float]] = None) -> Optional[List[float]]:
+        if not self.count(name):
+            return None if default is None else list(default)
+        return [self._stat(name, f"p{level}") for level in levels]
+
+    def exceedance_count(self, name: str, op: str, threshold: float) -> Optional[int]:
+        for i, key in enumerate(EXCEEDANCES):
+            if key[0] == name and key[1] == op and abs(key[2] - threshold) < 1e-6:
+                return int(self.exceedances[i])
+        return None
+
+def history_span(start_year: int, end_year: int, window_days: int) -> Tuple[date, date]:
+    padding = timedelta(days=window_days)
+    return date(start_year, 1, 1) - padding, date(end_year, 12, 31) + padding
+
+def compute_table(history: WeatherSeries, parameters: List[str], window_days: int, start_year: int, end_year: int) -> np.ndarray:
+    doy = history.day_of_year
+    dates = history.dates
+    padding = timedelta(days=window_days)
+    table = np.full((DAYS_PER_YEAR, len(parameters) * len(STATISTICS) + len(EXCEEDANCES)), np.nan, dtype=np.float32)
+
+    for day in range(1, DAYS_PER_YEAR + 1):
+        calendar_day = date(2001, 1, 1) + timedelta(days=day - 1)
+        first = date(start_year, calendar_day.month, calendar_day.day) - padding
+        last = date(end_year, calendar_day.month, calendar_day.day) + padding
+        distance = np.abs(doy - day)
+        mask = (
+            (np.minimum(distance, DAYS_PER_YEAR - distance) <= window_days)
+            & (dates >= np.datetime64(first)) & (dates <= np.datetime64(last))
+        )
+
+        row = table[day - 1]
+        for i, name in enumerate(parameters):
+            column = history.columns[name][mask]
+            values = column[~np.isnan(column)].astype(np.float64)
+            block = row[i * len(STATISTICS):(i + 1) * len(STATISTICS)]
+            block[0] = len(values)
+            if len(values):
+                block[1] = values.mean()
+                block[2] = values.std()
+                block[3:] = np.percentile(values, PERCENTILE_LEVELS)
+
+        for j, (name, op, threshold) in enumerate(EXCEEDANCES):
+            column = history.columns[name][mask]
+            valid = column[~np.isnan(column)]
+            row[len(parameters) * len(STATISTICS) + j] = np.count_nonzero(valid > threshold if op == ">" else valid < threshold)
+
+    return table
+
+Baseline = Tuple[int, int]
+
+def baseline_for(event_date: date) -> Baseline:
+    return event_date.year - HISTORY_YEARS, event_date.year - 1
+
+def _baseline_dir(baseline: Baseline) -> str:
+    return os.path.join(CLIMATOLOGY_DIR, f"v{TABLE_VERSION}", f"{baseline[0]}-{baseline[1]}")
+
+def _cell_path(baseline: Baseline, cell: Tuple[float, float]) -> str:
+    return os.path.join(_baseline_dir(baseline), f"{cell[0]:+08.3f}_{cell[1]:+09.3f}.npy")
+
+def _manifest_path(baseline: Baseline) -> str:
+    return os.path.join(_baseline_dir(baseline), "manifest.json")
+
+def write_manifest(parameters: List[str], window_days: int, start_year: int, end_year: int):
+    baseline = (start_year, end_year)
+    os.makedirs(_baseline_dir(baseline), exist_ok=True)
+    with open(_manifest_path(baseline) + ".tmp", "w") as f:
+        json.dump({
+            "parameters": parameters,
+            "statistics": STATISTICS,
+            "exceedances": EXCEEDANCES,
+            "window_days": window_days,
+            "start_year": start_year,
+            "end_year": end_year
+        }, f, indent=2)
+    os.replace(_manifest_path(baseline) + ".tmp", _manifest_path(baseline))
+    _manifests.pop(baseline, None)
+
+def write_table(cell: Tuple[float, float], table: np.ndarray, start_year: int, end_year: int):
+    baseline = (start_year, end_year)
+    os.makedirs(_baseline_dir(baseline), exist_ok=True)
+    path = _cell_path(baseline, cell)
+    np.save(path + ".tmp.npy", table)
+    os.replace(path + ".tmp.npy", path)
+    _tables.pop((baseline, cell), None)
+
+def _load_manifest(baseline: Baseline) -> Optional[dict]:
+    entry = _manifests[baseline] = _refresh(_manifests.get(baseline), _manifest_path(baseline), _read_json)
+    return entry[2]
+
+def _read_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def _table(baseline: Baseline, cell: Tuple[float, float]) -> Optional[np.ndarray]:
+    key = (baseline, cell)
+    entry = _tables[key] = _refresh(_tables.get(key), _cell_path(baseline, cell), lambda path: np.load(path, mmap_mode="r"))
+    return entry[2]
+
+def _refresh(entry: Optional[tuple], path: str, load) -> tuple:
+    now = time.monotonic()
+    if entry is not None and now - entry[0] < CLIMATOLOGY_RECHECK_SECONDS:
+        return entry
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if entry is not None and entry[1] == mtime:
+        return (now, mtime, entry[2])
+    return (now, mtime, None if mtime is None else load(path))
+
+def _compatible(manifest: Optional[dict], window_days: int) -> bool:
+    return (
+        manifest is not None
+        and manifest["window_days"] == window_days
+        and manifest["statistics"] == STATISTICS
+        and manifest["exceedances"] == [list(key) for key in EXCEEDANCES]
+    )
+
+def ensure_manifest(parameters: List[str], window_days: int, start_year: int, end_year: int) -> Optional[dict]:
+    if _load_manifest((start_year, end_year)) is None:
+        write_manifest(parameters, window_days, start_year, end_year)
+    manifest = _load_manifest((start_year, end_year))
+    if not _compatible(manifest, window_days) or manifest["parameters"] != parameters:
+        return None
+    return manifest
+
+def has_table(cell: Tuple[float, float], start_year: int, end_year: int) -> bool:
+    return os.path.exists(_cell_path((start_year, end_year), cell))
+
+def lookup(cell: Tuple[float, float], event_date: date, window_days: int) -> Optional[ClimatologyRecord]:
+    baseline = baseline_for(event_date)
+    manifest = _load_manifest(baseline)
+    if not _compatible(manifest, window_days):
+        return None
+
+    table = _table(baseline, cell)
+    if table is None:
+        return None
+
+    parameters = manifest["parameters"]
+    row = np.asarray(table[noleap_day_of_year(event_date) - 1])
+    split = len(parameters) * len(STATISTICS)
+    return ClimatologyRecord(parameters, row[:split].reshape(len(parameters), len(STATISTICS)), row[split:])
+
+def reset():
+    _manifests.clear()
+    _tables.clear()
@@ -0,0 +1,97 @@
+import os
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from typing import List, Optional
+
+import numpy as np
+
+GAZETTEER_PATH = os.environ.get(
+    "GAZETTEER_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "cities.tsv")
+)
+AMBIGUITY_RATIO = 5
+
+_index: Optional["_GazetteerIndex"] = None
+
+def normalize_name(name: str) -> str:
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"[^\w,]+", " ", text)
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    return ", ".join(part for part in parts if part)
+
+class _GazetteerIndex:
+    __slots__ = ("keys", "rows", "latitudes", "longitudes", "populations", "country_codes", "countries", "names")
+
+    def __init__(self, records: List[tuple]):
+        entries = []
+        for row, (name, alternates, country_code, country, _, _, _) in enumerate(records):
+            for key in {normalize_name(n) for n in [name] + alternates if n}:
+                entries.append((key, row))
+        entries.sort()
+
+        self.keys = [key for key, _ in entries]
+        self.rows = np.array([row for _, row in entries], dtype=np.int32)
+        self.names = [record[0] for record in records]
+        self.country_codes = [normalize_name(record[2]) for record in records]
+        self.countries = [normalize_name(record[3]) for record in records]
+        self.latitudes = np.array([record[4] for record in records], dtype=np.float32)
+        self.longitudes = np.array([record[5] for record in records], dtype=np.float32)
+        self.populations = np.array([record[6] for record in records], dtype=np.int64)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        name, _, qualifier = key.partition(", ")
+        lo, hi = bisect_left(self.keys, name), bisect_right(self.keys, name)
+        if lo == hi:
+            return None
+
+        candidates = sorted(set(self.rows[lo:hi].tolist()), key=lambda row: -self.populations[row])
+        if qualifier:
+            candidates = [row for row in candidates if qualifier in (self.country_codes[row], self.countries[row])]
+            if not candidates:
+                return None
+        elif len(candidates) > 1 and self.populations[candidates[0]] < AMBIGUITY_RATIO * self.populations[candidates[1]]:
+            return None
+
+        row = candidates[0]
+        country = self.countries[row].title() if len(self.countries[row]) > 2 else self.country_codes[row].upper()
+        return {
+            "latitude": round(float(self.latitudes[row]), 4),
+            "longitude": round(float(self.longitudes[row]), 4),
+            "display_name": f"{self.names[row]}, {country}"
+        }
+
+def _load_records(path: str) -> List[tuple]:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            try:
+                if len(fields) >= 19:
+                    records.append((
+                        fields[1], [fields[2]] + fields[3].split(","), fields[8], fields[8],
+                        float(fields[4]), float(fields[5]), int(fields[14] or 0)
+                    ))
+                else:
+                    records.append((
+                        fields[0], fields[1].split(","), fields[2], fields[3],
+                        float(fields[4]), float(fields[5]), int(fields[6] or 0)
+                    ))
+            except (IndexError, ValueError):
+                continue
+    return records
+
+def _get_index() -> Optional[_GazetteerIndex]:
+    global _index
+    if _index is None and GAZETTEER_PATH and os.path.exists(GAZETTEER_PATH):
+        _index = _GazetteerIndex(_load_records(GAZETTEER_PATH))
+    return _index
+
+def lookup(key: str) -> Optional[dict]:
+    index = _get_index()
+    if index is None:
+        return None
+    return index.lookup(key)
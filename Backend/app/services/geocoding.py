@@ -1,43 +1,210 @@
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+from collections import OrderedDict
+from typing import Optional
+from app.services import gazetteer, metrics, resilience
+from app.services.singleflight import SingleFlight
+import asyncio
+import json
+import os
+import sqlite3
+import threading
 import time
 
-geolocator = Nominatim(user_agent="will_it_rain_on_my_parade_v1")
+GEOCODE_CACHE_SIZE = int(os.environ.get("GEOCODE_CACHE_SIZE", 10000))
+GEOCODE_CACHE_TTL_SECONDS = int(os.environ.get("GEOCODE_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+GEOCODE_NOT_FOUND_TTL_SECONDS = int(os.environ.get("GEOCODE_NOT_FOUND_TTL_SECONDS", 3600))
+NOMINATIM_MIN_INTERVAL_SECONDS = float(os.environ.get("NOMINATIM_MIN_INTERVAL_SECONDS", 1.0))
+NOMINATIM_DOMAIN = os.environ.get("NOMINATIM_DOMAIN", "nominatim.openstreetmap.org")
+NOMINATIM_SCHEME = os.environ.get("NOMINATIM_SCHEME", "https")
+GEOCODE_CACHE_PATH = os.environ.get(
+    "GEOCODE_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "cache", "geocode_cache.sqlite3")
+)
+
+geolocator = None
+
+_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_rate_lock = asyncio.Lock()
+_last_request = 0.0
+_geocode_flights = SingleFlight("geocode")
+_lock = threading.Lock()
+_connection: Optional[sqlite3.Connection] = None
+
+async def get_coords_from_location(location_name: str):
+    key = gazetteer.normalize_name(location_name)
+    if not key:
+        return None
+
+    with metrics.span("geocode"):
+        entry = _cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            _cache.move_to_end(key)
+            metrics.CACHE_REQUESTS.inc(cache="geocode", result="hit")
+            return entry[1]
+
+        metrics.CACHE_REQUESTS.inc(cache="geocode", result="miss")
+        return await _geocode_flights.do(key, lambda: _resolve(key, location_name))
+
+async def _resolve(key: str, location_name: str):
+    coords = gazetteer.lookup(key)
+    metrics.CACHE_REQUESTS.inc(cache="gazetteer", result="miss" if coords is None else "hit")
+    if coords is not None:
+        _remember(key, coords)
+        return coords
+
+    shared = _shared_get(key)
+    if shared is not None:
+        _remember(key, shared[1], shared[0] - time.time())
+        return shared[1]
+
+    from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+    try:
+        return await resilience.within_deadline(_geocode_and_remember(key, location_name))
+    except (GeocoderTimedOut, GeocoderUnavailable, resilience.UpstreamUnavailable):
+        pass
+    except Exception as e:
+        print(f"Geocoding error: {e}")
+
+    entry = _cache.get(key)
+    if entry is not None and entry[1]:
+        metrics.CACHE_REQUESTS.inc(cache="geocode", result="stale")
+        return entry[1]
+    return None
+
+async def _geocode_and_remember(key: str, location_name: str):
+    coords = await _geocode(location_name)
+    ttl = _remember(key, coords)
+    _shared_put(key, coords, ttl)
+    return coords
+
+def _remember(key: str, coords: Optional[dict], ttl: Optional[float] = None) -> float:
+    if ttl is None:
+        ttl = GEOCODE_CACHE_TTL_SECONDS if coords else GEOCODE_NOT_FOUND_TTL_SECONDS
+    _cache[key] = (time.monotonic() + ttl, coords)
+    _cache.move_to_end(key)
+    while len(_cache) > GEOCODE_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return ttl
+
+def _connect() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(os.path.abspath(GEOCODE_CACHE_PATH)), exist_ok=True)
+        _connection = sqlite3.connect(GEOCODE_CACHE_PATH, check_same_thread=False, isolation_level=None)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geocodes (
+                key TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL,
+                body TEXT NOT NULL
+            )
+            """
+        )
+        _connection.execute("CREATE TABLE IF NOT EXISTS rate_limits (name TEXT PRIMARY KEY, next_at REAL NOT NULL)")
+    return _connection
+
+def _shared_get(key: str) -> Optional[tuple]:
+    if not GEOCODE_CACHE_PATH:
+        return None
+    with _lock:
+        row = _connect().execute("SELECT expires_at, body FROM geocodes WHERE key=? AND expires_at > ?", (key, time.time())).fetchone()
+    metrics.CACHE_REQUESTS.inc(cache="geocode_shared", result="miss" if row is None else "hit")
+    if row is None:
+        return None
+    return row[0], json.loads(row[1])
+
+def _shared_put(key: str, coords: Optional[dict], ttl: float):
+    if not GEOCODE_CACHE_PATH:
+        return
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        conn.execute("DELETE FROM geocodes WHERE expires_at <= ?", (now,))
+        conn.execute("INSERT OR REPLACE INTO geocodes (key, expires_at, body) VALUES (?, ?, ?)", (key, now + ttl, json.dumps(coords)))
+
+def _reserve_shared_slot() -> float:
+    with _lock:
+        conn = _connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT next_at FROM rate_limits WHERE name='nominatim'").fetchone()
+            slot = max(now, row[0] if row else now)
+            conn.execute("INSERT OR REPLACE INTO rate_limits (name, next_at) VALUES ('nominatim', ?)", (slot + NOMINATIM_MIN_INTERVAL_SECONDS,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return slot - now
+
+def _get_geolocator():
+    global geolocator
+    if geolocator is None:
+        from geopy.geocoders import Nominatim
+        geolocator = Nominatim(
+            user_agent="will_it_rain_on_my_parade_v1",
+            domain=NOMINATIM_DOMAIN,
+            scheme=NOMINATIM_SCHEME
+        )
+    return geolocator
+
+async def _geocode(location_name: str):
+    from geopy.exc import GeocoderTimedOut
 
-def get_coords_from_location(location_name: str):
     max_retries = 3
     retry_delay = 1
-    
+
+    breaker = resilience.breaker("nominatim")
     for attempt in range(max_retries):
         try:
-            location = geolocator.geocode(
-                location_name,
-                exactly_one=True,
-                timeout=10,
-                language="en"
-            )
-            
+            if not breaker.allow():
+                metrics.UPSTREAM_REQUESTS.inc(service="nominatim", status="circuit_open")
+                raise resilience.CircuitOpenError("nominatim")
+            await _wait_for_rate_limit()
+            started = time.perf_counter()
+            try:
+                location = await asyncio.to_thread(
+                    _get_geolocator().geocode,
+                    location_name,
+                    exactly_one=True,
+                    timeout=10,
+                    language="en"
+                )
+            except Exception as e:
+                breaker.failure()
+                metrics.UPSTREAM_REQUESTS.inc(service="nominatim", status=type(e).__name__)
+                raise
+            finally:
+                metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, service="nominatim")
+            breaker.success()
+            metrics.UPSTREAM_REQUESTS.inc(service="nominatim", status="found" if location else "not_found")
+
             if location:
                 return {
                     "latitude": location.latitude,
                     "longitude": location.longitude,
                     "display_name": location.address
                 }
-            
+
             return None
-            
+
         except GeocoderTimedOut:
             if attempt < max_retries - 1:
-                time.sleep(retry_delay)
+                metrics.UPSTREAM_RETRIES.inc(service="nominatim")
+                await asyncio.sleep(retry_delay)
                 retry_delay *= 2
                 continue
-            return None
-            
-        except GeocoderUnavailable:
-            return None
-            
-        except Exception as e:
-            print(f"Geocoding error: {e}")
-            return None
-    
-    return None
\ No newline at end of file
+            raise
+
+    return None
+
+async def _wait_for_rate_limit():
+    global _last_request
+    async with _rate_lock:
+        if GEOCODE_CACHE_PATH:
+            delay = await asyncio.to_thread(_reserve_shared_slot)
+        else:
+            delay = _last_request + NOMINATIM_MIN_INTERVAL_SECONDS - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        _last_request = time.monotonic()
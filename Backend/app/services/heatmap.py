@@ -0,0 +1,113 @@
+import asyncio
+import math
+import os
+from datetime import date, timedelta
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core import scoring
+from app.services import climatology, metrics, power_cache, resilience, weather_nasa
+
+HEATMAP_MAX_CELLS = int(os.environ.get("HEATMAP_MAX_CELLS", 2500))
+HEATMAP_REGIONAL_MIN_CELLS = int(os.environ.get("HEATMAP_REGIONAL_MIN_CELLS", 4))
+HEATMAP_POINT_CONCURRENCY = int(os.environ.get("HEATMAP_POINT_CONCURRENCY", 8))
+NO_DATA = 0
+
+def grid_axes(south: float, west: float, north: float, east: float) -> Tuple[np.ndarray, np.ndarray]:
+    return _axis(north, south, power_cache.LAT_RESOLUTION, descending=True), _axis(west, east, power_cache.LON_RESOLUTION)
+
+def _axis(a: float, b: float, resolution: float, descending: bool = False) -> np.ndarray:
+    low, high = min(a, b), max(a, b)
+    steps = np.arange(math.ceil(low / resolution), math.floor(high / resolution) + 1)
+    if not len(steps):
+        steps = np.array([round((low + high) / 2 / resolution)])
+    values = np.round(steps * resolution, 4)
+    return values[::-1] if descending else values
+
+def cell_count(south: float, west: float, north: float, east: float) -> int:
+    lats, lons = grid_axes(south, west, north, east)
+    return len(lats) * len(lons)
+
+async def score_grid(south: float, west: float, north: float, east: float, event_date: date, activity: str) -> dict:
+    lats, lons = grid_axes(south, west, north, east)
+    cells = [(float(lat), float(lon)) for lat in lats for lon in lons]
+    matrix = np.zeros((len(cells), 6))
+    has_data = np.zeros(len(cells), dtype=bool)
+
+    pending = list(range(len(cells)))
+    if weather_nasa.SEASONAL_WINDOW_DAYS > 0:
+        pending = []
+        for i, cell in enumerate(cells):
+            record = climatology.lookup(cell, event_date, weather_nasa.SEASONAL_WINDOW_DAYS)
+            metrics.CACHE_REQUESTS.inc(cache="climatology", result="miss" if record is None else "hit")
+            if record is None:
+                pending.append(i)
+            else:
+                matrix[i] = scoring.weather_matrix([weather_nasa.summarize_weather(record)])[0]
+                has_data[i] = record.count("T2M") > 0
+
+    if pending:
+        pending_cells = [cells[i] for i in pending]
+        windows = weather_nasa.history_windows(event_date)
+        start, end = windows[0][0], windows[-1][1]
+        mask = weather_nasa.seasonal_mask(start, end, [event_date])[0]
+
+        samples, missing = _read_samples(pending_cells, start, end, mask)
+        if missing:
+            await _fetch(missing, event_date)
+            samples, _ = _read_samples(pending_cells, start, end, mask)
+
+        with metrics.span("statistics"):
+            matrix[pending] = weather_nasa.window_weather_matrix(samples)
+            has_data[pending] = (~np.isnan(samples["T2M"])).any(axis=1)
+
+    with metrics.span("scoring"):
+        scores = scoring.score_matrix(matrix, [activity])[:, 0].astype(np.uint8)
+        scores[~has_data] = NO_DATA
+
+    return {
+        "north": float(lats[0]),
+        "west": float(lons[0]),
+        "lat_resolution": power_cache.LAT_RESOLUTION,
+        "lon_resolution": power_cache.LON_RESOLUTION,
+        "rows": len(lats),
+        "cols": len(lons),
+        "scores": scores.reshape(len(lats), len(lons)),
+        "cells_with_data": int(has_data.sum())
+    }
+
+def _read_samples(cells: List[Tuple[float, float]], start: date, end: date, mask: np.ndarray) -> Tuple[dict, List[Tuple[float, float]]]:
+    samples = {}
+    missing = np.zeros(len(cells), dtype=bool)
+    with metrics.span("power_cache"):
+        for name in weather_nasa.SCORING_PARAMETERS:
+            values, held = power_cache.read_region(cells, name, start, end)
+            samples[name] = values[:, mask]
+            missing |= ~held[:, mask].all(axis=1)
+    metrics.CACHE_REQUESTS.inc(len(cells) - int(missing.sum()), cache="power", result="hit")
+    metrics.CACHE_REQUESTS.inc(int(missing.sum()), cache="power", result="miss")
+    return samples, [cell for cell, absent in zip(cells, missing) if absent]
+
+async def _fetch(cells: List[Tuple[float, float]], event_date: date):
+    if len(cells) >= HEATMAP_REGIONAL_MIN_CELLS:
+        padding = timedelta(days=weather_nasa.SEASONAL_FETCH_PADDING_DAYS if weather_nasa.SEASONAL_WINDOW_DAYS > 0 else 0)
+        windows = weather_nasa.history_windows(event_date)
+        try:
+            await resilience.within_deadline(
+                weather_nasa.fetch_region(cells, weather_nasa.SCORING_PARAMETERS, windows[0][0] - padding, windows[-1][1] + padding)
+            )
+        except Exception as e:
+            print(f"NASA POWER regional error: {e}")
+        return
+
+    limit = asyncio.Semaphore(HEATMAP_POINT_CONCURRENCY)
+
+    async def fetch(cell: Tuple[float, float]):
+        async with limit:
+            try:
+                await weather_nasa.load_history(cell[0], cell[1], [event_date])
+            except Exception as e:
+                print(f"NASA POWER Error: {e}")
+
+    await asyncio.gather(*(fetch(cell) for cell in cells))
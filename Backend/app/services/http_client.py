@@ -0,0 +1,79 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.services import metrics, resilience
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", 200))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", 50))
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", 20))
+REQUEST_TIMEOUT_SECONDS = float(os.environ.get("HTTP_REQUEST_TIMEOUT_SECONDS", 30))
+
+_client: Optional[httpx.AsyncClient] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+async def start():
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT_SECONDS, connect=10.0),
+            headers={"User-Agent": "will_it_rain_on_my_parade_v1"}
+        )
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _host_limits.clear()
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+    return _host_limits[host]
+
+async def get_json(url: str, params: Optional[dict] = None):
+    if _client is None:
+        await start()
+
+    host = urlsplit(url).netloc
+    breaker = resilience.breaker(host)
+    async with _host_limit(url):
+        if not breaker.allow():
+            metrics.UPSTREAM_REQUESTS.inc(service=host, status="circuit_open")
+            raise resilience.CircuitOpenError(host)
+
+        started = time.perf_counter()
+        try:
+            response = await _client.get(url, params=params)
+        except httpx.HTTPError as e:
+            breaker.failure()
+            metrics.UPSTREAM_REQUESTS.inc(service=host, status=type(e).__name__)
+            raise
+        finally:
+            metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, service=host)
+        metrics.UPSTREAM_REQUESTS.inc(service=host, status=response.status_code)
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.failure()
+        else:
+            breaker.success()
+        response.raise_for_status()
+
+    with metrics.span("json_decode"):
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
@@ -0,0 +1,149 @@
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services import resilience, singleflight
+
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+DEFAULT_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+_registry: List["_Metric"] = []
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("timings", default=None)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> List[str]:
+        return []
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {_number(value)}" for key, value in sorted(self.values.items())]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = list(buckets)
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{self._format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+class Collected(_Metric):
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], kind: str, collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {_number(value)}" for key, value in sorted(self.collect().items())]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def render() -> str:
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+def start_request() -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    _timings.set(timings)
+    return timings
+
+@contextmanager
+def span(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    return ", ".join(entries + [f"total;dur={total * 1000:.1f}"])
+
+def _circuit_state() -> Dict[Tuple[str, ...], float]:
+    return {
+        (service, state): float(state == current)
+        for service, current in resilience.stats().items()
+        for state in ("closed", "open", "half_open")
+    }
+
+def _singleflight_calls() -> Dict[Tuple[str, ...], float]:
+    return {
+        (group, outcome): counts[outcome]
+        for group, counts in singleflight.stats().items()
+        for outcome in ("executed", "coalesced")
+    }
+
+def _singleflight_in_flight() -> Dict[Tuple[str, ...], float]:
+    return {(group,): counts["in_flight"] for group, counts in singleflight.stats().items()}
+
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Time to produce a response, by handler and status", ["method", "handler", "status"])
+STAGE_SECONDS = Histogram("stage_duration_seconds", "Time spent in each stage of request handling", ["stage"])
+UPSTREAM_REQUESTS = Counter("upstream_requests_total", "Calls to external services by outcome", ["service", "status"])
+UPSTREAM_SECONDS = Histogram("upstream_request_duration_seconds", "Latency of calls to external services", ["service"])
+UPSTREAM_RETRIES = Counter("upstream_retries_total", "Retries of calls to external services", ["service"])
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result", ["cache", "result"])
+PREFETCH_JOBS = Counter("prefetch_jobs_total", "Background prefetch jobs by kind and outcome", ["kind", "result"])
+FALLBACKS = Counter("fallback_total", "Responses built from fallback data instead of observations", ["source"])
+CIRCUIT_STATE = Collected("circuit_breaker_state", "Circuit breaker state per external service, 1 for the current state", ["service", "state"], "gauge", _circuit_state)
+SINGLEFLIGHT_CALLS = Collected("singleflight_calls_total", "Calls per single-flight group that ran or joined an in-flight call", ["group", "outcome"], "counter", _singleflight_calls)
+SINGLEFLIGHT_IN_FLIGHT = Collected("singleflight_in_flight", "Calls currently in flight per single-flight group", ["group"], "gauge", _singleflight_in_flight)
@@ -0,0 +1,265 @@
+import mmap
+import os
+import resource
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+CACHE_PATH = os.environ.get(
+    "POWER_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "cache", "power_cache.sqlite3")
+)
+TILES_DIR = os.environ.get("POWER_TILES_DIR", os.path.splitext(CACHE_PATH)[0] + "_tiles")
+CACHE_TTL_SECONDS = int(os.environ.get("POWER_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+CACHE_MAX_BYTES = int(os.environ.get("POWER_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+OPEN_TILES = int(os.environ.get("POWER_CACHE_OPEN_TILES", 8192))
+LAT_RESOLUTION = 0.5
+LON_RESOLUTION = 0.625
+SCHEMA_VERSION = 4
+
+_lock = threading.Lock()
+_connection: Optional[sqlite3.Connection] = None
+_maps: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+if sys.version_info >= (3, 13):
+    _MMAP_OPTIONS = {"trackfd": False}
+else:
+    _MMAP_OPTIONS = {}
+    _soft, _hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if _hard != resource.RLIM_INFINITY and _soft < _hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (_hard, _hard))
+            _soft = _hard
+        except (ValueError, OSError):
+            pass
+    OPEN_TILES = min(OPEN_TILES, _soft // 4)
+
+def grid_cell(lat: float, lon: float) -> Tuple[float, float]:
+    return (
+        round(round(lat / LAT_RESOLUTION) * LAT_RESOLUTION, 4),
+        round(round(lon / LON_RESOLUTION) * LON_RESOLUTION, 4)
+    )
+
+def _connect() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(os.path.abspath(CACHE_PATH)), exist_ok=True)
+        _connection = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        if _connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            _connection.execute("DROP TABLE IF EXISTS tiles")
+            _connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        _connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tiles (
+                cell_lat REAL NOT NULL,
+                cell_lon REAL NOT NULL,
+                parameter TEXT NOT NULL,
+                start_day INTEGER NOT NULL,
+                end_day INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                nbytes INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                PRIMARY KEY (cell_lat, cell_lon, parameter, start_day)
+            )
+            """
+        )
+        _connection.execute("CREATE INDEX IF NOT EXISTS tiles_accessed ON tiles (accessed_at)")
+        _connection.commit()
+    return _connection
+
+def held_ranges(cell: Tuple[float, float], parameter: str) -> List[Tuple[date, date]]:
+    with _lock:
+        rows = _connect().execute(
+            "SELECT start_day, end_day FROM tiles WHERE cell_lat=? AND cell_lon=? AND parameter=? AND fetched_at >= ? ORDER BY start_day",
+            (cell[0], cell[1], parameter, time.time() - CACHE_TTL_SECONDS)
+        ).fetchall()
+    return [(date.fromordinal(start), date.fromordinal(end)) for start, end in rows]
+
+def read(cell: Tuple[float, float], parameter: str, start: date, end: date) -> np.ndarray:
+    first, last = start.toordinal(), end.toordinal()
+    for attempt in range(3):
+        try:
+            return _read(cell, parameter, first, last)
+        except FileNotFoundError:
+            if attempt == 2:
+                raise
+
+def _read(cell: Tuple[float, float], parameter: str, first: int, last: int) -> np.ndarray:
+    now = time.time()
+
+    with _lock:
+        conn = _connect()
+        rows = conn.execute(
+            """
+            SELECT rowid, start_day, end_day, path FROM tiles
+            WHERE cell_lat=? AND cell_lon=? AND parameter=? AND start_day <= ? AND end_day >= ? AND fetched_at >= ?
+            """,
+            (cell[0], cell[1], parameter, last, first, now - CACHE_TTL_SECONDS)
+        ).fetchall()
+        if rows:
+            conn.executemany("UPDATE tiles SET accessed_at=? WHERE rowid=?", [(now, row[0]) for row in rows])
+            conn.commit()
+
+    if len(rows) == 1 and rows[0][1] <= first and rows[0][2] >= last:
+        _, seg_start, _, path = rows[0]
+        return _open(path)[first - seg_start:last - seg_start + 1]
+
+    column = np.full(last - first + 1, np.nan, dtype=np.float32)
+    for _, seg_start, seg_end, path in rows:
+        segment = _open(path)
+        lo, hi = max(first, seg_start), min(last, seg_end)
+        column[lo - first:hi - first + 1] = segment[lo - seg_start:hi - seg_start + 1]
+    return column
+
+def read_region(cells: List[Tuple[float, float]], parameter: str, start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+    first, last = start.toordinal(), end.toordinal()
+    for attempt in range(3):
+        try:
+            return _read_region(cells, parameter, first, last)
+        except FileNotFoundError:
+            if attempt == 2:
+                raise
+
+def _read_region(cells: List[Tuple[float, float]], parameter: str, first: int, last: int) -> Tuple[np.ndarray, np.ndarray]:
+    values = np.full((len(cells), last - first + 1), np.nan, dtype=np.float32)
+    held = np.zeros(values.shape, dtype=bool)
+    if not cells:
+        return values, held
+
+    index = {cell: i for i, cell in enumerate(cells)}
+    lats, lons = [cell[0] for cell in cells], [cell[1] for cell in cells]
+    now = time.time()
+
+    with _lock:
+        conn = _connect()
+        where = "cell_lat BETWEEN ? AND ? AND cell_lon BETWEEN ? AND ? AND parameter=? AND start_day <= ? AND end_day >= ? AND fetched_at >= ?"
+        args = (min(lats), max(lats), min(lons), max(lons), parameter, last, first, now - CACHE_TTL_SECONDS)
+        rows = conn.execute(f"SELECT cell_lat, cell_lon, start_day, end_day, path FROM tiles WHERE {where}", args).fetchall()
+        if rows:
+            conn.execute(f"UPDATE tiles SET accessed_at=? WHERE {where}", (now,) + args)
+            conn.commit()
+
+    for lat, lon, seg_start, seg_end, path in rows:
+        if (lat, lon) not in index:
+            continue
+        i = index[lat, lon]
+        lo, hi = max(first, seg_start), min(last, seg_end)
+        values[i, lo - first:hi - first + 1] = _open(path)[lo - seg_start:hi - seg_start + 1]
+        held[i, lo - first:hi - first + 1] = True
+    return values, held
+
+def _open(path: str) -> np.ndarray:
+    segment = _maps.get(path)
+    if segment is not None:
+        _maps.move_to_end(path)
+        return segment
+
+    with open(os.path.join(TILES_DIR, path), "rb") as f:
+        segment = np.frombuffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ, **_MMAP_OPTIONS), dtype=np.float32)
+    _maps[path] = segment
+    while len(_maps) > OPEN_TILES:
+        _maps.popitem(last=False)
+    return segment
+
+def put(cell: Tuple[float, float], parameters: List[str], start: date, end: date, columns: Dict[str, np.ndarray]):
+    put_many([(cell, parameters, start, end, columns)])
+
+def put_many(entries: List[Tuple[Tuple[float, float], List[str], date, date, Dict[str, np.ndarray]]]):
+    now = time.time()
+
+    written, replaced = [], []
+    with _lock:
+        conn = _connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for cell, parameters, start, end, columns in entries:
+                for name in parameters:
+                    path, old = _merge_segment(conn, cell, name, start.toordinal(), end.toordinal(), np.asarray(columns[name], dtype=np.float32), now)
+                    written.append(path)
+                    replaced += old
+            replaced += _evict(conn, now)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            _remove(written)
+            raise
+    _remove(replaced)
+
+def _merge_segment(conn: sqlite3.Connection, cell: Tuple[float, float], parameter: str, first: int, last: int, values: np.ndarray, now: float) -> Tuple[str, List[str]]:
+    rows = conn.execute(
+        """
+        SELECT rowid, start_day, end_day, fetched_at, path FROM tiles
+        WHERE cell_lat=? AND cell_lon=? AND parameter=? AND start_day <= ? AND end_day >= ? AND fetched_at >= ?
+        """,
+        (cell[0], cell[1], parameter, last + 1, first - 1, now - CACHE_TTL_SECONDS)
+    ).fetchall()
+
+    merged_first = min([first] + [row[1] for row in rows])
+    merged_last = max([last] + [row[2] for row in rows])
+    fetched_at = min([now] + [row[3] for row in rows])
+
+    merged = np.full(merged_last - merged_first + 1, np.nan, dtype=np.float32)
+    for _, seg_start, seg_end, _, path in rows:
+        merged[seg_start - merged_first:seg_end - merged_first + 1] = _open(path)
+    merged[first - merged_first:last - merged_first + 1] = values
+
+    path = _write_tile(cell, parameter, merged)
+    conn.executemany("DELETE FROM tiles WHERE rowid=?", [(row[0],) for row in rows])
+    replaced = [row[4] for row in rows]
+    replaced += [row[0] for row in conn.execute(
+        "SELECT path FROM tiles WHERE cell_lat=? AND cell_lon=? AND parameter=? AND start_day=?",
+        (cell[0], cell[1], parameter, merged_first)
+    )]
+    conn.execute(
+        "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (cell[0], cell[1], parameter, merged_first, merged_last, fetched_at, now, merged.nbytes, path)
+    )
+    return path, replaced
+
+def _write_tile(cell: Tuple[float, float], parameter: str, values: np.ndarray) -> str:
+    os.makedirs(TILES_DIR, exist_ok=True)
+    path = f"{cell[0]:+08.3f}_{cell[1]:+09.3f}_{parameter}_{uuid.uuid4().hex}.f32"
+    values.tofile(os.path.join(TILES_DIR, path + ".tmp"))
+    os.replace(os.path.join(TILES_DIR, path + ".tmp"), os.path.join(TILES_DIR, path))
+    return path
+
+def _remove(paths: List[str]):
+    for path in paths:
+        _maps.pop(path, None)
+        try:
+            os.remove(os.path.join(TILES_DIR, path))
+        except OSError:
+            pass
+
+def _evict(conn: sqlite3.Connection, now: float) -> List[str]:
+    expired = [row[0] for row in conn.execute("SELECT path FROM tiles WHERE fetched_at < ?", (now - CACHE_TTL_SECONDS,))]
+    conn.execute("DELETE FROM tiles WHERE fetched_at < ?", (now - CACHE_TTL_SECONDS,))
+
+    total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM tiles").fetchone()[0]
+    if total <= CACHE_MAX_BYTES:
+        return expired
+
+    for rowid, nbytes, path in conn.execute("SELECT rowid, nbytes, path FROM tiles ORDER BY accessed_at").fetchall():
+        if total <= CACHE_MAX_BYTES:
+            break
+        conn.execute("DELETE FROM tiles WHERE rowid=?", (rowid,))
+        expired.append(path)
+        total -= nbytes
+    return expired
+
+def clear():
+    with _lock:
+        conn = _connect()
+        paths = [row[0] for row in conn.execute("SELECT path FROM tiles")]
+        conn.execute("DELETE FROM tiles")
+        conn.commit()
+    _remove(paths)
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.services import metrics
+
+PREFETCH_ENABLED = os.environ.get("PREFETCH_ENABLED", "1").lower() in ("1", "true", "yes")
+PREFETCH_VENUES = os.environ.get("PREFETCH_VENUES", "")
+PREFETCH_INTERVAL_SECONDS = float(os.environ.get("PREFETCH_INTERVAL_SECONDS", 300))
+PREFETCH_STARTUP_DELAY_SECONDS = float(os.environ.get("PREFETCH_STARTUP_DELAY_SECONDS", 10))
+PREFETCH_MAX_JOBS = int(os.environ.get("PREFETCH_MAX_JOBS", 10))
+PREFETCH_JOB_INTERVAL_SECONDS = float(os.environ.get("PREFETCH_JOB_INTERVAL_SECONDS", 2))
+PREFETCH_TOP_CELLS = int(os.environ.get("PREFETCH_TOP_CELLS", 20))
+PREFETCH_MIN_SCORE = float(os.environ.get("PREFETCH_MIN_SCORE", 2))
+PREFETCH_HORIZON_DAYS = int(os.environ.get("PREFETCH_HORIZON_DAYS", 14))
+PREFETCH_QUIET_REQUESTS_PER_MINUTE = float(os.environ.get("PREFETCH_QUIET_REQUESTS_PER_MINUTE", 30))
+PREFETCH_DECAY = float(os.environ.get("PREFETCH_DECAY", 0.5))
+
+Cell = Tuple[float, float]
+
+_cell_demand: Dict[Cell, float] = {}
+_date_demand: Dict[Tuple[Cell, date], float] = {}
+_recent: deque = deque()
+_seeded: Optional[List[Cell]] = None
+_task: Optional[asyncio.Task] = None
+
+def record_demand(cell: Cell, event_dates: List[date]):
+    _cell_demand[cell] = _cell_demand.get(cell, 0.0) + 1
+    for event_date in event_dates:
+        key = (cell, event_date)
+        _date_demand[key] = _date_demand.get(key, 0.0) + 1
+    _recent.append(time.monotonic())
+
+def requests_last_minute() -> int:
+    cutoff = time.monotonic() - 60
+    while _recent and _recent[0] < cutoff:
+        _recent.popleft()
+    return len(_recent)
+
+def is_quiet() -> bool:
+    return requests_last_minute() <= PREFETCH_QUIET_REQUESTS_PER_MINUTE
+
+def hot_cells(limit: int = PREFETCH_TOP_CELLS) -> List[Cell]:
+    ranked = sorted(_cell_demand.items(), key=lambda item: item[1], reverse=True)
+    return [cell for cell, score in ranked[:limit] if score >= PREFETCH_MIN_SCORE]
+
+def upcoming_weekends(today: date, horizon_days: int = PREFETCH_HORIZON_DAYS) -> List[date]:
+    return [day for day in (today + timedelta(days=i) for i in range(horizon_days + 1)) if day.weekday() >= 5]
+
+def _decay():
+    for demand in (_cell_demand, _date_demand):
+        for key in list(demand):
+            demand[key] *= PREFETCH_DECAY
+            if demand[key] < 0.01:
+                del demand[key]
+
+def _read_venues(value: str) -> List[str]:
+    if value and os.path.isfile(value):
+        with open(value) as f:
+            entries = [line.strip() for line in f]
+    else:
+        entries = [entry.strip() for entry in value.split(";")]
+    return [entry for entry in entries if entry and not entry.startswith("#")]
+
+def _parse_coords(entry: str) -> Optional[Cell]:
+    try:
+        lat, lon = entry.split(",")
+        return float(lat), float(lon)
+    except ValueError:
+        return None
+
+async def _seed_cells() -> List[Cell]:
+    global _seeded
+    if _seeded is None:
+        from app.services import geocoding, power_cache
+
+        cells = []
+        for venue in _read_venues(PREFETCH_VENUES):
+            coords = _parse_coords(venue)
+            if coords is None:
+                resolved = await geocoding.get_coords_from_location(venue)
+                if not resolved:
+                    print(f"Prefetch: skipping venue {venue}, location not found")
+                    continue
+                coords = (resolved["latitude"], resolved["longitude"])
+            cells.append(power_cache.grid_cell(*coords))
+        _seeded = list(dict.fromkeys(cells))
+    return _seeded
+
+async def plan_jobs(today: Optional[date] = None) -> List[Tuple[str, Cell, list]]:
+    from app.services import climatology, weather_nasa
+
+    today = today or date.today()
+    cells = list(dict.fromkeys(await _seed_cells() + hot_cells()))
+    manifest = None
+    if weather_nasa.SEASONAL_WINDOW_DAYS > 0:
+        manifest = climatology.ensure_manifest(
+            weather_nasa.DAILY_PARAMETERS,
+            weather_nasa.SEASONAL_WINDOW_DAYS,
+            *climatology.baseline_for(today)
+        )
+
+    jobs = []
+    for cell in cells:
+        if manifest is not None:
+            if not climatology.has_table(cell, manifest["start_year"], manifest["end_year"]):
+                jobs.append(("climatology", cell, [manifest["start_year"], manifest["end_year"]]))
+            continue
+
+        hot_dates = sorted(
+            (score, event_date) for (demand_cell, event_date), score in _date_demand.items() if demand_cell == cell
+        )
+        event_dates = list(dict.fromkeys(
+            upcoming_weekends(today) + [event_date for score, event_date in reversed(hot_dates)]
+        ))
+        missing = [
+            event_date for event_date in event_dates
+            if any(
+                weather_nasa.plan_fetch(cell, weather_nasa.DAILY_PARAMETERS, start, end)
+                for start, end in weather_nasa.history_windows(event_date)
+            )
+        ]
+        if missing:
+            jobs.append(("series", cell, missing))
+    return jobs
+
+async def _run_job(kind: str, cell: Cell, args: list):
+    from app.services import climatology, weather_nasa
+
+    if kind == "climatology":
+        start_year, end_year = args
+        history = await weather_nasa.get_daily_series(
+            cell[0], cell[1], *climatology.history_span(start_year, end_year, weather_nasa.SEASONAL_WINDOW_DAYS)
+        )
+        table = await asyncio.to_thread(
+            climatology.compute_table, history, weather_nasa.DAILY_PARAMETERS, weather_nasa.SEASONAL_WINDOW_DAYS, start_year, end_year
+        )
+        climatology.write_table(cell, table, start_year, end_year)
+    else:
+        await weather_nasa.load_history(cell[0], cell[1], args)
+
+async def run_once(max_jobs: int = PREFETCH_MAX_JOBS) -> int:
+    done = 0
+    for kind, cell, args in (await plan_jobs())[:max_jobs]:
+        if not is_quiet():
+            metrics.PREFETCH_JOBS.inc(kind=kind, result="deferred")
+            break
+        try:
+            await _run_job(kind, cell, args)
+        except Exception as e:
+            print(f"Prefetch error for cell {cell[0]}, {cell[1]}: {e}")
+            metrics.PREFETCH_JOBS.inc(kind=kind, result="error")
+            break
+        metrics.PREFETCH_JOBS.inc(kind=kind, result="done")
+        done += 1
+        await asyncio.sleep(PREFETCH_JOB_INTERVAL_SECONDS)
+    _decay()
+    return done
+
+async def _loop():
+    await asyncio.sleep(PREFETCH_STARTUP_DELAY_SECONDS)
+    while True:
+        try:
+            await run_once()
+        except Exception as e:
+            print(f"Prefetch error: {e}")
+        await asyncio.sleep(PREFETCH_INTERVAL_SECONDS)
+
+def start():
+    global _task
+    if PREFETCH_ENABLED and _task is None:
+        _task = asyncio.create_task(_loop())
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Dict, Optional, TypeVar
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_OPEN_SECONDS = float(os.environ.get("CIRCUIT_OPEN_SECONDS", 30))
+REQUEST_BUDGET_SECONDS = float(os.environ.get("REQUEST_BUDGET_SECONDS", 10))
+
+T = TypeVar("T")
+
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+_background: set = set()
+
+class UpstreamUnavailable(Exception):
+    pass
+
+class CircuitOpenError(UpstreamUnavailable):
+    def __init__(self, service: str):
+        super().__init__(f"{service} is unavailable, circuit open")
+
+class DeadlineExceeded(UpstreamUnavailable):
+    def __init__(self):
+        super().__init__(f"request budget of {REQUEST_BUDGET_SECONDS:g}s exceeded")
+
+class CircuitBreaker:
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if time.monotonic() - self.opened_at >= CIRCUIT_OPEN_SECONDS:
+            self.state = "half_open"
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= CIRCUIT_FAILURE_THRESHOLD:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+def breaker(service: str) -> CircuitBreaker:
+    if service not in _breakers:
+        _breakers[service] = CircuitBreaker(service)
+    return _breakers[service]
+
+def is_open(service: str) -> bool:
+    return breaker(service).state != "closed"
+
+def stats() -> Dict[str, str]:
+    return {name: b.state for name, b in _breakers.items()}
+
+def start_request(budget: float = REQUEST_BUDGET_SECONDS):
+    _deadline.set(time.monotonic() + budget if budget > 0 else None)
+
+def detach():
+    _deadline.set(None)
+
+def remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+async def within_deadline(work: Awaitable[T]) -> T:
+    budget = remaining()
+    if budget is None:
+        return await work
+    if budget <= 0:
+        if asyncio.iscoroutine(work):
+            work.close()
+        else:
+            _keep(asyncio.ensure_future(work))
+        raise DeadlineExceeded()
+
+    task = asyncio.ensure_future(work)
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), budget)
+    except asyncio.TimeoutError:
+        _keep(task)
+        raise DeadlineExceeded()
+
+def _keep(task: asyncio.Future):
+    _background.add(task)
+    task.add_done_callback(_finished)
+
+def _finished(task: asyncio.Future):
+    _background.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Background refresh error: {task.exception()}")
@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.services import metrics, resilience
+from app.services.singleflight import SingleFlight
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 5000))
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", 6 * 3600))
+RESPONSE_CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH", "")
+RESPONSE_CACHE_STALE_SECONDS = int(os.environ.get("RESPONSE_CACHE_STALE_SECONDS", 7 * 24 * 3600))
+
+_entries: "OrderedDict[str, tuple]" = OrderedDict()
+_lock = threading.Lock()
+_connection: Optional[sqlite3.Connection] = None
+_flights = SingleFlight("response")
+_revalidating: set = set()
+
+def make_key(*parts) -> str:
+    return "|".join(str(part) for part in parts)
+
+async def get_or_compute(key: str, compute: Callable[[], Awaitable[Tuple[dict, bool]]]) -> Tuple[dict, bool, bool]:
+    entry = _get(key)
+    if entry is not None:
+        payload, fresh = entry
+        if fresh:
+            return payload, True, False
+        _revalidate(key, compute)
+        return payload, False, True
+    metrics.CACHE_REQUESTS.inc(cache="response", result="miss")
+    payload, cacheable = await _flights.do(key, lambda: _compute(key, compute))
+    return payload, cacheable, False
+
+def _revalidate(key: str, compute: Callable[[], Awaitable[Tuple[dict, bool]]]):
+    async def run():
+        resilience.detach()
+        try:
+            await _flights.do(key, lambda: _compute(key, compute))
+        except Exception as e:
+            print(f"Response cache refresh error: {e}")
+
+    task = asyncio.ensure_future(run())
+    _revalidating.add(task)
+    task.add_done_callback(_revalidating.discard)
+
+async def _compute(key: str, compute: Callable[[], Awaitable[Tuple[dict, bool]]]) -> Tuple[dict, bool]:
+    payload, cacheable = await compute()
+    if cacheable:
+        _put(key, payload)
+    return payload, cacheable
+
+def respond(request: Request, payload: dict, cacheable: bool = True, stale: bool = False) -> Response:
+    with metrics.span("serialization"):
+        body = _dumps(payload)
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={RESPONSE_CACHE_TTL_SECONDS}" if cacheable else "no-store"
+    }
+    if stale:
+        headers["Warning"] = '110 - "Response is Stale"'
+        headers["Access-Control-Expose-Headers"] = "Warning"
+
+    if cacheable and _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def _dumps(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+def _get(key: str) -> Optional[Tuple[dict, bool]]:
+    now = time.time()
+    entry = _entries.get(key)
+    if entry is not None and entry[0] > now:
+        _entries.move_to_end(key)
+        metrics.CACHE_REQUESTS.inc(cache="response", result="hit")
+        return entry[1], True
+
+    if RESPONSE_CACHE_PATH:
+        with _lock:
+            row = _connect().execute(
+                "SELECT expires_at, body FROM responses WHERE key=? AND expires_at > ?", (key, now - RESPONSE_CACHE_STALE_SECONDS)
+            ).fetchone()
+        if row is not None and (entry is None or row[0] > entry[0]):
+            entry = (row[0], json.loads(row[1]))
+            _remember(key, *entry)
+            if entry[0] > now:
+                metrics.CACHE_REQUESTS.inc(cache="response", result="shared_hit")
+                return entry[1], True
+
+    if entry is None or entry[0] + RESPONSE_CACHE_STALE_SECONDS <= now:
+        return None
+    metrics.CACHE_REQUESTS.inc(cache="response", result="stale")
+    return entry[1], False
+
+def _put(key: str, payload: dict):
+    expires_at = time.time() + RESPONSE_CACHE_TTL_SECONDS
+    _remember(key, expires_at, payload)
+
+    if RESPONSE_CACHE_PATH:
+        with _lock:
+            conn = _connect()
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time() - RESPONSE_CACHE_STALE_SECONDS,))
+            conn.execute("INSERT OR REPLACE INTO responses (key, expires_at, body) VALUES (?, ?, ?)", (key, expires_at, _dumps(payload)))
+            conn.commit()
+
+def _remember(key: str, expires_at: float, payload: dict):
+    _entries[key] = (expires_at, payload)
+    _entries.move_to_end(key)
+    while len(_entries) > RESPONSE_CACHE_SIZE:
+        _entries.popitem(last=False)
+
+def _connect() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(os.path.abspath(RESPONSE_CACHE_PATH)), exist_ok=True)
+        _connection = sqlite3.connect(RESPONSE_CACHE_PATH, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL,
+                body BLOB NOT NULL
+            )
+            """
+        )
+        _connection.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires_at)")
+        _connection.commit()
+    return _connection
+
+def clear():
+    _entries.clear()
+    if RESPONSE_CACHE_PATH:
+        with _lock:
+            conn = _connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
@@ -0,0 +1,189 @@
+import asyncio
+import csv
+import importlib.util
+import io
+import json
+import os
+from datetime import date, timedelta
+from typing import AsyncIterator, Iterator, List, Tuple
+
+import numpy as np
+
+from app.services import weather_nasa
+from app.services.weather_series import WeatherSeries
+
+EXPORT_CHUNK_DAYS = int(os.environ.get("EXPORT_CHUNK_DAYS", 3653))
+EXPORT_ROWS_PER_BLOCK = 1000
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet")
+}
+COLUMNAR_FORMATS = ["arrow", "parquet"]
+
+Place = Tuple[str, float, float]
+
+def columnar_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+def date_chunks(start: date, end: date, days: int = EXPORT_CHUNK_DAYS) -> List[Tuple[date, date]]:
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=days - 1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+async def stream_daily_series(places: List[Place], start: date, end: date, parameters: List[str], fmt: str) -> AsyncIterator[bytes]:
+    encoder = _ENCODERS[fmt](parameters)
+    jobs = [(place, chunk) for place in places for chunk in date_chunks(start, end)]
+
+    def fetch(job):
+        (_, lat, lon), (chunk_start, chunk_end) = job
+        return asyncio.ensure_future(weather_nasa.get_daily_series(lat, lon, chunk_start, chunk_end, parameters))
+
+    pending = fetch(jobs[0])
+    prefix = encoder.header()
+    try:
+        for i, (place, _) in enumerate(jobs):
+            series = await pending
+            pending = fetch(jobs[i + 1]) if i + 1 < len(jobs) else None
+            for block in encoder.encode(place, series):
+                if prefix:
+                    block, prefix = prefix + block, b""
+                if block:
+                    yield block
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+    yield encoder.close()
+
+def _rounded(series: WeatherSeries, name: str) -> np.ndarray:
+    return np.round(series.columns[name].astype(np.float64), 2)
+
+class _CsvEncoder:
+    def __init__(self, parameters: List[str]):
+        self.parameters = parameters
+
+    def _write(self, rows) -> bytes:
+        output = io.StringIO()
+        csv.writer(output).writerows(rows)
+        return output.getvalue().encode()
+
+    def header(self) -> bytes:
+        return self._write([["location", "latitude", "longitude", "date"] + self.parameters])
+
+    def encode(self, place: Place, series: WeatherSeries) -> Iterator[bytes]:
+        dates = np.datetime_as_string(series.dates, unit="D")
+        columns = [_rounded(series, name) for name in self.parameters]
+        for lo in range(0, len(dates), EXPORT_ROWS_PER_BLOCK):
+            hi = lo + EXPORT_ROWS_PER_BLOCK
+            values = [["" if value != value else value for value in column[lo:hi].tolist()] for column in columns]
+            yield self._write(place + (day, *row) for day, *row in zip(dates[lo:hi].tolist(), *values))
+
+    def close(self) -> bytes:
+        return b""
+
+class _NdjsonEncoder:
+    def __init__(self, parameters: List[str]):
+        self.parameters = parameters
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, place: Place, series: WeatherSeries) -> Iterator[bytes]:
+        name, lat, lon = place
+        dates = np.datetime_as_string(series.dates, unit="D")
+        columns = [_rounded(series, parameter) for parameter in self.parameters]
+        for lo in range(0, len(dates), EXPORT_ROWS_PER_BLOCK):
+            hi = lo + EXPORT_ROWS_PER_BLOCK
+            values = [[None if value != value else value for value in column[lo:hi].tolist()] for column in columns]
+            lines = []
+            for day, *row in zip(dates[lo:hi].tolist(), *values):
+                record = {"location": name, "latitude": lat, "longitude": lon, "date": day}
+                record.update(zip(self.parameters, row))
+                lines.append(json.dumps(record, separators=(",", ":")))
+            yield ("\n".join(lines) + "\n").encode()
+
+    def close(self) -> bytes:
+        return b""
+
+class _Sink:
+    def __init__(self):
+        self.buffers = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.buffers.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.buffers)
+        self.buffers.clear()
+        return data
+
+class _ArrowEncoder:
+    def __init__(self, parameters: List[str]):
+        import pyarrow as pa
+
+        self.pa = pa
+        self.parameters = parameters
+        self.schema = pa.schema(
+            [("location", pa.string()), ("latitude", pa.float64()), ("longitude", pa.float64()), ("date", pa.date32())]
+            + [(name, pa.float32()) for name in parameters]
+        )
+        self.sink = _Sink()
+        self.writer = self._open_writer()
+
+    def _open_writer(self):
+        return self.pa.ipc.new_stream(self.sink, self.schema)
+
+    def header(self) -> bytes:
+        return self.sink.drain()
+
+    def encode(self, place: Place, series: WeatherSeries) -> Iterator[bytes]:
+        pa = self.pa
+        name, lat, lon = place
+        rows = len(series)
+        arrays = [
+            pa.array(np.full(rows, name, dtype=object), pa.string()),
+            pa.array(np.full(rows, lat)),
+            pa.array(np.full(rows, lon)),
+            pa.array(series.dates.astype("datetime64[D]"), pa.date32())
+        ] + [
+            pa.array(series.columns[parameter], mask=np.isnan(series.columns[parameter]))
+            for parameter in self.parameters
+        ]
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        yield self.sink.drain()
+
+    def close(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+class _ParquetEncoder(_ArrowEncoder):
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(self.sink, self.schema)
+
+_ENCODERS = {
+    "csv": _CsvEncoder,
+    "ndjson": _NdjsonEncoder,
+    "arrow": _ArrowEncoder,
+    "parquet": _ParquetEncoder
+}
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+_groups: List["SingleFlight"] = []
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self.executed = 0
+        self.coalesced = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        _groups.append(self)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+def stats() -> Dict[str, Dict[str, int]]:
+    return {
+        group.name: {"executed": group.executed, "coalesced": group.coalesced, "in_flight": len(group._inflight)}
+        for group in _groups
+    }
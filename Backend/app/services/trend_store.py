@@ -0,0 +1,237 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services import metrics
+from app.services.singleflight import SingleFlight
+
+TRENDS_CACHE_PATH = os.environ.get(
+    "TRENDS_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "cache", "trends.sqlite3")
+)
+TRENDS_CACHE_CELLS = int(os.environ.get("TRENDS_CACHE_CELLS", 10000))
+YEAR_FINAL_AFTER_DAYS = 30
+YEAR_ORIGIN = 2000
+FIELDS = ["temp_days", "temp_sum", "precip_days", "precip_sum", "heat_days", "cold_days", "rain_days"]
+
+Cell = Tuple[float, float]
+
+_lock = threading.Lock()
+_connection: Optional[sqlite3.Connection] = None
+_tables: "OrderedDict[Cell, YearlyTable]" = OrderedDict()
+_fill_flights = SingleFlight("trends")
+
+class LeastSquares:
+    __slots__ = ("n", "sx", "sy", "sxx", "sxy")
+
+    def __init__(self, n: int = 0, sx: float = 0.0, sy: float = 0.0, sxx: float = 0.0, sxy: float = 0.0):
+        self.n = n
+        self.sx = sx
+        self.sy = sy
+        self.sxx = sxx
+        self.sxy = sxy
+
+    def add(self, x: float, y: float) -> "LeastSquares":
+        return LeastSquares(self.n + 1, self.sx + x, self.sy + y, self.sxx + x * x, self.sxy + x * y)
+
+    def __sub__(self, other: "LeastSquares") -> "LeastSquares":
+        return LeastSquares(
+            self.n - other.n, self.sx - other.sx, self.sy - other.sy, self.sxx - other.sxx, self.sxy - other.sxy
+        )
+
+    def slope(self) -> float:
+        denominator = self.n * self.sxx - self.sx * self.sx
+        if self.n < 2 or denominator == 0:
+            return 0.0
+        return (self.n * self.sxy - self.sx * self.sy) / denominator
+
+    def intercept(self) -> float:
+        if not self.n:
+            return 0.0
+        return (self.sy - self.slope() * self.sx) / self.n
+
+class YearlyTable:
+    __slots__ = ("first_year", "rows", "temperature", "precipitation")
+
+    def __init__(self, first_year: int):
+        self.first_year = first_year
+        self.rows: List[tuple] = []
+        self.temperature = [LeastSquares()]
+        self.precipitation = [LeastSquares()]
+
+    @property
+    def last_year(self) -> int:
+        return self.first_year + len(self.rows) - 1
+
+    def covers(self, first_year: int, last_year: int) -> bool:
+        return bool(self.rows) and self.first_year <= first_year and last_year <= self.last_year
+
+    def append(self, row: tuple):
+        year = self.first_year + len(self.rows)
+        self.rows.append(row)
+        self.temperature.append(_add_temperature(self.temperature[-1], year, row))
+        self.precipitation.append(_add_precipitation(self.precipitation[-1], row))
+
+class TrendSpan:
+    __slots__ = ("years", "rows", "temperature", "precipitation", "last_complete_year")
+
+    def __init__(self, years: List[int], rows: List[tuple], temperature: LeastSquares, precipitation: LeastSquares):
+        self.years = years
+        self.rows = rows
+        self.temperature = temperature
+        self.precipitation = precipitation
+        self.last_complete_year = date.today().year - 1
+
+    def extend(self, first_year: int, rows: List[tuple], precipitation_rank: int):
+        for i, row in enumerate(rows):
+            self.years.append(first_year + i)
+            self.rows.append(row)
+            if first_year + i > self.last_complete_year:
+                continue
+            self.temperature = _add_temperature(self.temperature, first_year + i, row)
+            if row[2]:
+                self.precipitation = self.precipitation.add(precipitation_rank, row[3])
+                precipitation_rank += 1
+
+    def yearly_data(self) -> List[dict]:
+        return [
+            {
+                "year": year,
+                "avg_temp": float(temp_sum / temp_days) if temp_days else None,
+                "total_precip": float(precip_sum) if precip_days else None,
+                "extreme_heat_days": int(heat_days),
+                "extreme_cold_days": int(cold_days),
+                "heavy_rain_days": int(rain_days),
+                "partial": year > self.last_complete_year
+            }
+            for year, (temp_days, temp_sum, precip_days, precip_sum, heat_days, cold_days, rain_days) in zip(self.years, self.rows)
+            if temp_days or precip_days
+        ]
+
+def _add_temperature(acc: LeastSquares, year: int, row: tuple) -> LeastSquares:
+    return acc.add(year - YEAR_ORIGIN, row[1] / row[0]) if row[0] else acc
+
+def _add_precipitation(acc: LeastSquares, row: tuple) -> LeastSquares:
+    return acc.add(acc.n, row[3]) if row[2] else acc
+
+def last_final_year(today: Optional[date] = None) -> int:
+    return ((today or date.today()) - timedelta(days=YEAR_FINAL_AFTER_DAYS)).year - 1
+
+async def load_span(cell: Cell, first_year: int, last_year: int, fetch: Callable[[int, int], Awaitable[np.ndarray]]) -> TrendSpan:
+    stored_last = min(last_year, last_final_year())
+
+    table = None
+    if first_year <= stored_last:
+        table = _tables.get(cell)
+        if table is None or not table.covers(first_year, stored_last):
+            table = await _fill_flights.do((cell, first_year, stored_last), lambda: _fill(cell, first_year, stored_last, fetch))
+        else:
+            _tables.move_to_end(cell)
+            metrics.CACHE_REQUESTS.inc(cache="trends", result="hit")
+
+    if table is not None:
+        lo, hi = first_year - table.first_year, stored_last - table.first_year + 1
+        span = TrendSpan(
+            list(range(first_year, stored_last + 1)),
+            table.rows[lo:hi],
+            table.temperature[hi] - table.temperature[lo],
+            table.precipitation[hi] - table.precipitation[lo]
+        )
+        rank = table.precipitation[hi].n
+    else:
+        span, rank = TrendSpan([], [], LeastSquares(), LeastSquares()), 0
+
+    fresh_first = max(first_year, stored_last + 1)
+    if fresh_first <= last_year:
+        fresh = await fetch(fresh_first, last_year)
+        span.extend(fresh_first, [tuple(row) for row in fresh.tolist()], rank)
+    return span
+
+async def _fill(cell: Cell, first_year: int, last_year: int, fetch: Callable[[int, int], Awaitable[np.ndarray]]) -> "YearlyTable":
+    table = _load(cell)
+    if table is not None and table.covers(first_year, last_year):
+        metrics.CACHE_REQUESTS.inc(cache="trends", result="shared_hit")
+        return table
+
+    metrics.CACHE_REQUESTS.inc(cache="trends", result="miss")
+    if table is None:
+        gaps = [(first_year, last_year)]
+    else:
+        gaps = [
+            (first_year, table.first_year - 1),
+            (table.last_year + 1, last_year)
+        ]
+    for gap_first, gap_last in gaps:
+        if gap_first <= gap_last:
+            _save(cell, gap_first, await fetch(gap_first, gap_last))
+    return _load(cell)
+
+def _load(cell: Cell) -> Optional[YearlyTable]:
+    with _lock:
+        rows = _connect().execute(
+            f"SELECT year, {', '.join(FIELDS)} FROM years WHERE cell_lat=? AND cell_lon=? ORDER BY year",
+            (cell[0], cell[1])
+        ).fetchall()
+    if not rows:
+        return None
+
+    start = len(rows) - 1
+    while start > 0 and rows[start - 1][0] == rows[start][0] - 1:
+        start -= 1
+
+    table = YearlyTable(rows[start][0])
+    for row in rows[start:]:
+        table.append(tuple(row[1:]))
+
+    _tables[cell] = table
+    _tables.move_to_end(cell)
+    while len(_tables) > TRENDS_CACHE_CELLS:
+        _tables.popitem(last=False)
+    return table
+
+def _save(cell: Cell, first_year: int, sums: np.ndarray):
+    with _lock:
+        conn = _connect()
+        conn.executemany(
+            f"INSERT OR REPLACE INTO years (cell_lat, cell_lon, year, {', '.join(FIELDS)}) VALUES (?, ?, ?{', ?' * len(FIELDS)})",
+            [(cell[0], cell[1], first_year + i, *row) for i, row in enumerate(sums.tolist())]
+        )
+        conn.commit()
+
+def _connect() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(os.path.abspath(TRENDS_CACHE_PATH)), exist_ok=True)
+        _connection = sqlite3.connect(TRENDS_CACHE_PATH, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS years (
+                cell_lat REAL NOT NULL,
+                cell_lon REAL NOT NULL,
+                year INTEGER NOT NULL,
+                temp_days INTEGER NOT NULL,
+                temp_sum REAL NOT NULL,
+                precip_days INTEGER NOT NULL,
+                precip_sum REAL NOT NULL,
+                heat_days INTEGER NOT NULL,
+                cold_days INTEGER NOT NULL,
+                rain_days INTEGER NOT NULL,
+                PRIMARY KEY (cell_lat, cell_lon, year)
+            )
+            """
+        )
+        _connection.commit()
+    return _connection
+
+def clear():
+    _tables.clear()
+    with _lock:
+        conn = _connect()
+        conn.execute("DELETE FROM years")
+        conn.commit()
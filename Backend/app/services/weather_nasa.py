@@ -1,209 +1,490 @@
-import requests
+import asyncio
+import httpx
+import os
 from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
 import numpy as np
-from scipy import stats
+from app.core import exceedance, scoring
+from app.services import climatology, http_client, metrics, power_cache, prefetch, resilience, trend_store
+from app.services.singleflight import SingleFlight
+from app.services.weather_series import WeatherSeries, noleap_day_of_year
+
+POWER_DAILY_URL = os.environ.get("POWER_DAILY_URL", "https://power.larc.nasa.gov/api/temporal/daily/point")
+POWER_REGIONAL_URL = os.environ.get("POWER_REGIONAL_URL", "https://power.larc.nasa.gov/api/temporal/daily/regional")
+POWER_REGIONAL_MIN_DEGREES = float(os.environ.get("POWER_REGIONAL_MIN_DEGREES", 2))
+POWER_REGIONAL_MAX_DEGREES = float(os.environ.get("POWER_REGIONAL_MAX_DEGREES", 10))
+POWER_REGIONAL_PARAMETERS_PER_REQUEST = int(os.environ.get("POWER_REGIONAL_PARAMETERS_PER_REQUEST", 6))
+POWER_PUBLICATION_LAG_DAYS = int(os.environ.get("POWER_PUBLICATION_LAG_DAYS", 7))
+DAILY_PARAMETERS = ["T2M", "T2M_MAX", "T2M_MIN", "PRECTOTCORR", "WS10M", "RH2M", "CLOUD_AMT", "ALLSKY_SFC_UV_INDEX"]
+TREND_PARAMETERS = ["T2M", "PRECTOTCORR", "WS10M"]
+SCORING_PARAMETERS = ["T2M", "T2M_MAX", "PRECTOTCORR", "WS10M", "RH2M", "CLOUD_AMT"]
+FETCH_MERGE_GAP_DAYS = 30
+TEMPERATURE_PERCENTILES = [10, 25, 50, 75, 90]
+SEASONAL_WINDOW_DAYS = int(os.environ.get("SEASONAL_WINDOW_DAYS", 15))
+SEASONAL_FETCH_PADDING_DAYS = 15
+EXTREME_EVENTS = [
+    ("very_hot", "T2M", ">", 32, 1.0, None),
+    ("very_cold", "T2M", "<", 5, 1.0, None),
+    ("very_wet", "PRECTOTCORR", ">", 2, 1.0, 10.0),
+    ("very_windy", "WS10M", ">", 30, 3.6, 15.0),
+    ("uncomfortable_humidity", "RH2M", ">", 75, 1.0, 20.0)
+]
+THRESHOLD_METRICS = {
+    "temperature": ("T2M", 1.0),
+    "max_temperature": ("T2M_MAX", 1.0),
+    "min_temperature": ("T2M_MIN", 1.0),
+    "precipitation": ("PRECTOTCORR", 1.0),
+    "wind": ("WS10M", 3.6),
+    "humidity": ("RH2M", 1.0),
+    "cloud_cover": ("CLOUD_AMT", 1.0),
+    "uv_index": ("ALLSKY_SFC_UV_INDEX", 1.0)
+}
+
+_fetch_flights = SingleFlight("power_fetch")
+
+async def get_historical_weather(lat: float, lon: float, event_date: date, use_climatology: bool = True):
+    return (await get_historical_weather_batch(lat, lon, [event_date], use_climatology))[0]
+
+async def get_historical_weather_batch(lat: float, lon: float, event_dates: List[date], use_climatology: bool = True, track_demand: bool = True) -> List[dict]:
+    results = [None] * len(event_dates)
+    if track_demand:
+        prefetch.record_demand(power_cache.grid_cell(lat, lon), event_dates)
+    if use_climatology and SEASONAL_WINDOW_DAYS > 0:
+        cell = power_cache.grid_cell(lat, lon)
+        for i, event_date in enumerate(event_dates):
+            record = climatology.lookup(cell, event_date, SEASONAL_WINDOW_DAYS)
+            metrics.CACHE_REQUESTS.inc(cache="climatology", result="miss" if record is None else "hit")
+            if record is not None:
+                results[i] = summarize_weather(record, data_source="NASA POWER climatology")
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
 
-def get_historical_weather(lat: float, lon: float, event_date: date):
     try:
-        return _get_nasa_power_data(lat, lon, event_date)
+        fetched = await _get_nasa_power_data(lat, lon, [event_dates[i] for i in pending])
     except Exception as e:
         print(f"NASA POWER Error: {e}")
-        return _get_fallback_data()
+        fetched = _cached_weather(lat, lon, [event_dates[i] for i in pending])
 
-def _get_nasa_power_data(lat: float, lon: float, event_date: date):
-    year = event_date.year
-    month = event_date.month
-    day = event_date.day
-    
-    start_date = f"{year-10}{month:02d}{day:02d}"
-    end_date = f"{year-1}{month:02d}{day:02d}"
-    
-    params = {
-        "parameters": "T2M,T2M_MAX,T2M_MIN,PRECTOTCORR,WS10M,RH2M,CLOUD_AMT,ALLSKY_SFC_UV_INDEX",
-        "community": "RE",
-        "longitude": lon,
-        "latitude": lat,
-        "start": start_date,
-        "end": end_date,
-        "format": "JSON"
-    }
-    
-    url = "https://power.larc.nasa.gov/api/temporal/daily/point"
-    
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()
-    
-    data = response.json()
-    props = data["properties"]["parameter"]
-    
-    all_temps = []
-    all_max_temps = []
-    all_min_temps = []
-    all_precip = []
-    all_wind = []
-    all_humidity = []
-    all_cloud = []
-    all_uv = []
-    
-    for date_str in props.get("T2M", {}):
-        if props["T2M"][date_str] != -999:
-            all_temps.append(props["T2M"][date_str])
-        if "T2M_MAX" in props and props["T2M_MAX"].get(date_str, -999) != -999:
-            all_max_temps.append(props["T2M_MAX"][date_str])
-        if "T2M_MIN" in props and props["T2M_MIN"].get(date_str, -999) != -999:
-            all_min_temps.append(props["T2M_MIN"][date_str])
-        if "PRECTOTCORR" in props and props["PRECTOTCORR"].get(date_str, -999) != -999:
-            all_precip.append(props["PRECTOTCORR"][date_str])
-        if "WS10M" in props and props["WS10M"].get(date_str, -999) != -999:
-            all_wind.append(props["WS10M"][date_str])
-        if "RH2M" in props and props["RH2M"].get(date_str, -999) != -999:
-            all_humidity.append(props["RH2M"][date_str])
-        if "CLOUD_AMT" in props and props["CLOUD_AMT"].get(date_str, -999) != -999:
-            all_cloud.append(props["CLOUD_AMT"][date_str])
-        if "ALLSKY_SFC_UV_INDEX" in props and props["ALLSKY_SFC_UV_INDEX"].get(date_str, -999) != -999:
-            all_uv.append(props["ALLSKY_SFC_UV_INDEX"][date_str])
+    for i, result in zip(pending, fetched):
+        results[i] = result
+    return results
+
+async def get_daily_series(lat: float, lon: float, start: date, end: date, parameters: List[str] = DAILY_PARAMETERS) -> WeatherSeries:
+    columns = await _fetch_daily_series(lat, lon, parameters, start, end)
+    return WeatherSeries(start, columns)
+
+async def _get_nasa_power_data(lat: float, lon: float, event_dates: List[date]) -> List[dict]:
+    history = await load_history(lat, lon, event_dates)
+
+    with metrics.span("statistics"):
+        return [summarize_weather(_history_for(history, event_date)) for event_date in event_dates]
+
+async def load_history(lat: float, lon: float, event_dates: List[date]) -> WeatherSeries:
+    windows = merge_windows([window for event_date in event_dates for window in history_windows(event_date)])
+    start, end = windows[0][0], windows[-1][1]
+    padding = SEASONAL_FETCH_PADDING_DAYS if SEASONAL_WINDOW_DAYS > 0 else 0
+
+    columns = await resilience.within_deadline(_fetch_daily_series(lat, lon, DAILY_PARAMETERS, start, end, windows, padding))
+    return WeatherSeries(start, columns)
+
+def _cached_history(lat: float, lon: float, event_dates: List[date]) -> WeatherSeries:
+    windows = merge_windows([window for event_date in event_dates for window in history_windows(event_date)])
+    start, end = windows[0][0], windows[-1][1]
+    cell = power_cache.grid_cell(lat, lon)
+    with metrics.span("power_cache"):
+        return WeatherSeries(start, {name: power_cache.read(cell, name, start, end) for name in DAILY_PARAMETERS})
+
+def _cached_weather(lat: float, lon: float, event_dates: List[date]) -> List[dict]:
+    history = _cached_history(lat, lon, event_dates)
+    results = []
+    for event_date in event_dates:
+        series = _history_for(history, event_date)
+        if series.count("T2M"):
+            metrics.FALLBACKS.inc(source="power_cache")
+            results.append({**summarize_weather(series), "stale": True})
+        else:
+            metrics.FALLBACKS.inc(source="power")
+            results.append(_get_fallback_data())
+    return results
+
+async def sweep_dates(lat: float, lon: float, event_dates: List[date]) -> Tuple[np.ndarray, Callable[[int], dict]]:
+    cell = power_cache.grid_cell(lat, lon)
+    prefetch.record_demand(cell, [])
+
+    if SEASONAL_WINDOW_DAYS > 0:
+        records = [climatology.lookup(cell, event_date, SEASONAL_WINDOW_DAYS) for event_date in event_dates]
+        metrics.CACHE_REQUESTS.inc(cache="climatology", result="miss" if None in records else "hit")
+        if None not in records:
+            summaries = [summarize_weather(record, data_source="NASA POWER climatology") for record in records]
+            return scoring.weather_matrix(summaries), summaries.__getitem__
+
+    stale = False
+    try:
+        history = await load_history(lat, lon, event_dates)
+    except Exception as e:
+        history = _cached_history(lat, lon, event_dates)
+        if not history.count("T2M"):
+            raise
+        print(f"NASA POWER Error: {e}")
+        metrics.FALLBACKS.inc(source="power_cache")
+        stale = True
+
+    with metrics.span("statistics"):
+        matrix = seasonal_weather_matrix(history, event_dates)
+    return matrix, lambda i: {**summarize_weather(_history_for(history, event_dates[i])), "stale": stale}
+
+def seasonal_weather_matrix(history: WeatherSeries, event_dates: List[date]) -> np.ndarray:
+    mask = seasonal_mask(history.start, history.end, event_dates)
+    used = mask.any(axis=0)
+    mask = mask[:, used]
+    return window_weather_matrix({
+        name: np.where(mask, history.columns[name][used], np.nan) for name in SCORING_PARAMETERS
+    })
+
+def seasonal_mask(start: date, end: date, event_dates: List[date]) -> np.ndarray:
+    days = WeatherSeries(start, {"days": np.zeros((end - start).days + 1, dtype=np.float32)})
+    ordinals = start.toordinal() + np.arange(len(days))
+    windows = [history_windows(event_date) for event_date in event_dates]
+    first = np.array([[w[0][0].toordinal()] for w in windows])
+    last = np.array([[w[-1][1].toordinal()] for w in windows])
+    mask = (ordinals >= first) & (ordinals <= last)
+    if SEASONAL_WINDOW_DAYS > 0:
+        centers = np.array([[noleap_day_of_year(event_date)] for event_date in event_dates])
+        distance = np.abs(days.day_of_year - centers)
+        mask &= np.minimum(distance, 365 - distance) <= SEASONAL_WINDOW_DAYS
+    return mask
+
+def window_weather_matrix(samples: Dict[str, np.ndarray]) -> np.ndarray:
+    def means(name: str, default: float) -> np.ndarray:
+        values = samples[name]
+        valid = ~np.isnan(values)
+        counts = np.count_nonzero(valid, axis=1)
+        sums = np.where(valid, values, 0).sum(axis=1, dtype=np.float64)
+        return np.divide(sums, counts, out=np.full(len(values), default), where=counts > 0)
+
+    def p90(name: str, default: float) -> np.ndarray:
+        values = np.sort(samples[name].astype(np.float64), axis=1)
+        counts = np.count_nonzero(~np.isnan(values), axis=1)
+        position = np.maximum(counts - 1, 0) * 0.9
+        lo = np.floor(position).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(counts - 1, 0))
+        lower = np.take_along_axis(values, lo[:, None], axis=1)[:, 0]
+        upper = np.take_along_axis(values, hi[:, None], axis=1)[:, 0]
+        return np.where(counts > 0, lower + (upper - lower) * (position - lo), default)
+
+    return np.column_stack([
+        means("T2M", 20.0),
+        p90("T2M_MAX", 25.0),
+        means("PRECTOTCORR", 0.5),
+        means("WS10M", 15.0 / 3.6) * 3.6,
+        means("RH2M", 50.0),
+        means("CLOUD_AMT", 40.0)
+    ])
+
+def history_windows(event_date: date) -> List[Tuple[date, date]]:
+    if SEASONAL_WINDOW_DAYS > 0:
+        return seasonal_windows(event_date, SEASONAL_WINDOW_DAYS)
+    return [(_shift_year(event_date, -10), _shift_year(event_date, -1))]
+
+def _history_for(history: WeatherSeries, event_date: date) -> WeatherSeries:
+    windows = history_windows(event_date)
+    series = history.between(windows[0][0], windows[-1][1])
+    if SEASONAL_WINDOW_DAYS > 0:
+        series = series.seasonal_window(event_date, SEASONAL_WINDOW_DAYS)
+    return series
+
+def merge_windows(windows: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    merged = []
+    for window_start, window_end in sorted(windows):
+        if merged and window_start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], window_end))
+        else:
+            merged.append((window_start, window_end))
+    return merged
+
+def summarize_weather(series: WeatherSeries, data_source: str = "NASA POWER") -> dict:
+    temp_percentiles = series.percentiles("T2M", TEMPERATURE_PERCENTILES, [15.0, 17.0, 20.0, 23.0, 25.0])
     
     result = {
-        "avg_temp_c": float(np.mean(all_temps)) if all_temps else 20.0,
-        "min_temp_c": float(np.percentile(all_min_temps, 10)) if all_min_temps else 15.0,
-        "max_temp_c": float(np.percentile(all_max_temps, 90)) if all_max_temps else 25.0,
-        "avg_precipitation_mmhr": float(np.mean(all_precip)) if all_precip else 0.5,
-        "avg_wind_speed_kmh": float(np.mean(all_wind) * 3.6) if all_wind else 15.0,
-        "avg_humidity_percent": float(np.mean(all_humidity)) if all_humidity else 50.0,
-        "avg_cloud_cover_percent": float(np.mean(all_cloud)) if all_cloud else 40.0,
-        "avg_uv_index": float(np.mean(all_uv)) if all_uv else 5.0,
-        "data_source": "NASA POWER",
-        "years_analyzed": len(all_temps),
+        "avg_temp_c": series.mean("T2M", 20.0),
+        "min_temp_c": (series.percentiles("T2M_MIN", [10]) or [15.0])[0],
+        "max_temp_c": (series.percentiles("T2M_MAX", [90]) or [25.0])[0],
+        "avg_precipitation_mmhr": series.mean("PRECTOTCORR", 0.5),
+        "avg_wind_speed_kmh": series.mean("WS10M", 15.0 / 3.6) * 3.6,
+        "avg_humidity_percent": series.mean("RH2M", 50.0),
+        "avg_cloud_cover_percent": series.mean("CLOUD_AMT", 40.0),
+        "avg_uv_index": series.mean("ALLSKY_SFC_UV_INDEX", 5.0),
+        "data_source": data_source,
+        "years_analyzed": series.count("T2M"),
         "temperature_distribution": {
-            "mean": float(np.mean(all_temps)) if all_temps else 20.0,
-            "std": float(np.std(all_temps)) if all_temps else 5.0,
+            "mean": series.mean("T2M", 20.0),
+            "std": series.std("T2M", 5.0),
             "percentiles": {
-                "10": float(np.percentile(all_temps, 10)) if all_temps else 15.0,
-                "25": float(np.percentile(all_temps, 25)) if all_temps else 17.0,
-                "50": float(np.percentile(all_temps, 50)) if all_temps else 20.0,
-                "75": float(np.percentile(all_temps, 75)) if all_temps else 23.0,
-                "90": float(np.percentile(all_temps, 90)) if all_temps else 25.0
+                str(level): value for level, value in zip(TEMPERATURE_PERCENTILES, temp_percentiles)
             }
         },
-        "raw_data": {
-            "temperatures": all_temps,
-            "precipitation": all_precip,
-            "wind": all_wind,
-            "humidity": all_humidity
-        }
+        "series": series
     }
     
     return result
 
-def calculate_extreme_probabilities(weather_data: dict):
-    temps = weather_data.get("raw_data", {}).get("temperatures", [])
-    precip = weather_data.get("raw_data", {}).get("precipitation", [])
-    wind = weather_data.get("raw_data", {}).get("wind", [])
-    humidity = weather_data.get("raw_data", {}).get("humidity", [])
-    
-    if not temps:
-        return _get_default_probabilities()
-    
-    temp_mean = np.mean(temps)
-    temp_std = np.std(temps)
+def seasonal_windows(event_date: date, half_width: int, years: int = 10) -> List[Tuple[date, date]]:
+    windows = []
+    for offset in range(years, 0, -1):
+        center = _shift_year(event_date, -offset)
+        windows.append((center - timedelta(days=half_width), center + timedelta(days=half_width)))
+    return windows
+
+async def _fetch_daily_series(lat: float, lon: float, parameters: List[str], start: date, end: date, windows: Optional[List[Tuple[date, date]]] = None, padding_days: int = 0) -> Dict[str, np.ndarray]:
+    cell = power_cache.grid_cell(lat, lon)
+    windows = windows or [(start, end)]
+    return await _fetch_flights.do(
+        (cell, tuple(parameters), start, end, tuple(windows)),
+        lambda: _load_daily_series(cell, parameters, start, end, windows, padding_days)
+    )
+
+async def _load_daily_series(cell: Tuple[float, float], parameters: List[str], start: date, end: date, windows: List[Tuple[date, date]], padding_days: int) -> Dict[str, np.ndarray]:
+    with metrics.span("power_cache"):
+        columns = {name: power_cache.read(cell, name, start, end) for name in parameters}
+
+        padding = timedelta(days=padding_days)
+        plan = [
+            (fetch_start - padding, fetch_end + padding, names)
+            for window_start, window_end in windows
+            for fetch_start, fetch_end, names in plan_fetch(cell, parameters, window_start, window_end)
+        ]
+    held = any(not np.isnan(column).all() for column in columns.values())
+    metrics.CACHE_REQUESTS.inc(cache="power", result="miss" if not held else "partial" if plan else "hit")
+
+    async def download(fetch_start: date, fetch_end: date, names: List[str]) -> Dict[str, np.ndarray]:
+        fetched = await _download_daily_series(cell, names, fetch_start, fetch_end)
+        power_cache.put(cell, names, fetch_start, fetch_end, fetched)
+        return fetched
+
+    downloads = await asyncio.gather(*(download(fetch_start, fetch_end, names) for fetch_start, fetch_end, names in plan))
+
+    for (fetch_start, fetch_end, names), fetched in zip(plan, downloads):
+        lo, hi = max(fetch_start, start), min(fetch_end, end)
+        if lo > hi:
+            continue
+        target = slice((lo - start).days, (hi - start).days + 1)
+        source = slice((lo - fetch_start).days, (hi - fetch_start).days + 1)
+        for name in names:
+            if not columns[name].flags.writeable:
+                columns[name] = np.array(columns[name])
+            columns[name][target] = fetched[name][source]
+
+    return columns
+
+def plan_fetch(cell: Tuple[float, float], parameters: List[str], start: date, end: date) -> List[Tuple[date, date, List[str]]]:
+    gaps = {name: _missing_ranges(power_cache.held_ranges(cell, name), start, end) for name in parameters}
+
+    ranges = []
+    for gap_start, gap_end in sorted(g for name_gaps in gaps.values() for g in name_gaps):
+        if ranges and (gap_start - ranges[-1][1]).days <= FETCH_MERGE_GAP_DAYS:
+            ranges[-1][1] = max(ranges[-1][1], gap_end)
+        else:
+            ranges.append([gap_start, gap_end])
+
+    plan = []
+    for range_start, range_end in ranges:
+        names = [
+            name for name in parameters
+            if any(gap_start <= range_end and gap_end >= range_start for gap_start, gap_end in gaps[name])
+        ]
+        plan.append((range_start, range_end, names))
+    return plan
+
+def _missing_ranges(held: List[Tuple[date, date]], start: date, end: date) -> List[Tuple[date, date]]:
+    missing = []
+    cursor = start
+    for held_start, held_end in held:
+        if held_end < cursor:
+            continue
+        if held_start > end:
+            break
+        if held_start > cursor:
+            missing.append((cursor, held_start - timedelta(days=1)))
+        cursor = max(cursor, held_end + timedelta(days=1))
+        if cursor > end:
+            return missing
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
+
+async def _download_daily_series(cell: Tuple[float, float], parameters: List[str], start: date, end: date) -> Dict[str, np.ndarray]:
+    params = {
+        "parameters": ",".join(parameters),
+        "community": "RE",
+        "longitude": cell[1],
+        "latitude": cell[0],
+        "start": start.strftime("%Y%m%d"),
+        "end": end.strftime("%Y%m%d"),
+        "format": "JSON"
+    }
     
-    prob_very_hot = float((1 - stats.norm.cdf(32, temp_mean, temp_std)) * 100)
-    prob_very_cold = float(stats.norm.cdf(5, temp_mean, temp_std) * 100)
+    with metrics.span("power_download"):
+        data = await http_client.get_json(POWER_DAILY_URL, params=params)
+    with metrics.span("power_parse"):
+        return _parse_power_parameters(data["properties"]["parameter"], parameters, start, end)
+
+async def fetch_region(cells: List[Tuple[float, float]], parameters: List[str], start: date, end: date):
+    lats, lons = [cell[0] for cell in cells], [cell[1] for cell in cells]
+    requests = []
+    for lat_min, lat_max in _region_spans(lats):
+        for lon_min, lon_max in _region_spans(lons):
+            tile = [cell for cell in cells if lat_min <= cell[0] <= lat_max and lon_min <= cell[1] <= lon_max]
+            if not tile:
+                continue
+            for i in range(0, len(parameters), POWER_REGIONAL_PARAMETERS_PER_REQUEST):
+                names = parameters[i:i + POWER_REGIONAL_PARAMETERS_PER_REQUEST]
+                requests.append(_download_region(tile, names, start, end, _pad_span(lat_min, lat_max, -90, 90), _pad_span(lon_min, lon_max, -180, 180)))
+    await asyncio.gather(*requests)
+
+def _region_spans(values: List[float]) -> List[Tuple[float, float]]:
+    spans = []
+    for value in sorted(set(values)):
+        if spans and value <= spans[-1][0] + POWER_REGIONAL_MAX_DEGREES:
+            spans[-1] = (spans[-1][0], value)
+        else:
+            spans.append((value, value))
+    return spans
+
+def _pad_span(low: float, high: float, floor: float, ceiling: float) -> Tuple[float, float]:
+    padding = max(0.0, POWER_REGIONAL_MIN_DEGREES - (high - low)) / 2
+    low, high = max(floor, low - padding), min(ceiling, high + padding)
+    if high - low < POWER_REGIONAL_MIN_DEGREES:
+        low, high = max(floor, high - POWER_REGIONAL_MIN_DEGREES), min(ceiling, low + POWER_REGIONAL_MIN_DEGREES)
+    return low, high
+
+async def _download_region(cells: List[Tuple[float, float]], parameters: List[str], start: date, end: date, lat_span: Tuple[float, float], lon_span: Tuple[float, float]):
+    params = {
+        "parameters": ",".join(parameters),
+        "community": "RE",
+        "latitude-min": lat_span[0],
+        "latitude-max": lat_span[1],
+        "longitude-min": lon_span[0],
+        "longitude-max": lon_span[1],
+        "start": start.strftime("%Y%m%d"),
+        "end": end.strftime("%Y%m%d"),
+        "format": "JSON"
+    }
+
+    with metrics.span("power_download"):
+        data = await http_client.get_json(POWER_REGIONAL_URL, params=params)
+    with metrics.span("power_parse"):
+        features = data["features"]
+        points = np.array([feature["geometry"]["coordinates"][:2] for feature in features], dtype=np.float64).reshape(-1, 2)
+        if not len(points):
+            return
+        targets = np.array([(cell[1], cell[0]) for cell in cells], dtype=np.float64)
+        nearest = ((targets[:, None, :] - points[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+
+        parsed = {}
+        for j in set(nearest.tolist()):
+            parsed[j] = _parse_power_parameters(features[j]["properties"]["parameter"], parameters, start, end)
+    power_cache.put_many([(cell, parameters, start, end, parsed[j]) for cell, j in zip(cells, nearest.tolist())])
+
+def _parse_power_parameters(props: dict, parameters: List[str], start: date, end: date) -> Dict[str, np.ndarray]:
+    days = (end - start).days + 1
+    first_key, last_key = start.strftime("%Y%m%d"), end.strftime("%Y%m%d")
     
-    if precip:
-        precip_mean = np.mean(precip)
-        precip_std = np.std(precip)
-        prob_very_wet = float((1 - stats.norm.cdf(2, precip_mean, precip_std)) * 100)
-    else:
-        prob_very_wet = 10.0
+    columns = {}
+    for name in parameters:
+        values = props.get(name, {})
+        column = np.full(days, np.nan, dtype=np.float32)
+        if values:
+            parsed = np.fromiter(values.values(), dtype=np.float32, count=len(values))
+            if len(values) == days and next(iter(values)) == first_key and next(reversed(values)) == last_key:
+                column[:] = parsed
+            else:
+                offsets = _day_offsets(values.keys(), start)
+                inside = (offsets >= 0) & (offsets < days)
+                column[offsets[inside]] = parsed[inside]
+            column[column == -999] = np.nan
+        columns[name] = column
+    return columns
+
+def _day_offsets(keys, start: date) -> np.ndarray:
+    stamps = np.fromiter(keys, dtype=np.int64)
+    years = (stamps // 10000 - 1970).astype("datetime64[Y]")
+    months = (years.astype("datetime64[M]") + (stamps // 100 % 100 - 1).astype("timedelta64[M]"))
+    days = months.astype("datetime64[D]") + (stamps % 100 - 1).astype("timedelta64[D]")
+    return (days - np.datetime64(start)).astype(np.int64)
+
+def _shift_year(day: date, years: int) -> date:
+    if day.month == 2 and day.day == 29:
+        day = day.replace(day=28)
+    return day.replace(year=day.year + years)
+
+def calculate_extreme_probabilities(weather_data: dict, mode: Optional[str] = None):
+    series = weather_data.get("series")
     
-    if wind:
-        wind_kmh = [w * 3.6 for w in wind]
-        wind_mean = np.mean(wind_kmh)
-        wind_std = np.std(wind_kmh)
-        prob_very_windy = float((1 - stats.norm.cdf(30, wind_mean, wind_std)) * 100)
-    else:
-        prob_very_windy = 15.0
+    if series is None or not series.count("T2M"):
+        return _get_default_probabilities()
     
-    if humidity:
-        humidity_mean = np.mean(humidity)
-        humidity_std = np.std(humidity)
-        prob_uncomfortable = float((1 - stats.norm.cdf(75, humidity_mean, humidity_std)) * 100)
-    else:
-        prob_uncomfortable = 20.0
+    probabilities = {}
+    with metrics.span("probabilities"):
+        for key, name, op, threshold, scale, default in EXTREME_EVENTS:
+            if series.count(name):
+                probability = float(exceedance.exceedance_probabilities(series, name, op, [threshold / scale], mode)[0])
+            else:
+                probability = default
+            probabilities[key] = {
+                "probability": min(100, max(0, probability)),
+                "threshold": threshold,
+                "confidence": _get_confidence_level(series.count(name))
+            }
     
-    return {
-        "very_hot": {
-            "probability": min(100, max(0, prob_very_hot)),
-            "threshold": 32,
-            "confidence": _get_confidence_level(len(temps))
-        },
-        "very_cold": {
-            "probability": min(100, max(0, prob_very_cold)),
-            "threshold": 5,
-            "confidence": _get_confidence_level(len(temps))
-        },
-        "very_wet": {
-            "probability": min(100, max(0, prob_very_wet)),
-            "threshold": 2,
-            "confidence": _get_confidence_level(len(precip))
-        },
-        "very_windy": {
-            "probability": min(100, max(0, prob_very_windy)),
-            "threshold": 30,
-            "confidence": _get_confidence_level(len(wind))
-        },
-        "uncomfortable_humidity": {
-            "probability": min(100, max(0, prob_uncomfortable)),
-            "threshold": 75,
-            "confidence": _get_confidence_level(len(humidity))
-        }
-    }
+    return probabilities
+
+def calculate_threshold_probabilities(weather_data: dict, queries: List[Tuple[str, str, float]], mode: Optional[str] = None) -> List[dict]:
+    series = weather_data.get("series")
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, (metric, op, _) in enumerate(queries):
+        groups.setdefault((metric, op), []).append(i)
+
+    results = [None] * len(queries)
+    for (metric, op), indices in groups.items():
+        name, scale = THRESHOLD_METRICS[metric]
+        count = series.count(name) if series is not None else 0
+        if count:
+            values = exceedance.exceedance_probabilities(series, name, op, [queries[i][2] / scale for i in indices], mode)
+        else:
+            values = [None] * len(indices)
+        for i, value in zip(indices, values):
+            results[i] = {
+                "metric": metric,
+                "operator": op,
+                "threshold": queries[i][2],
+                "probability": None if value is None else min(100.0, max(0.0, float(value))),
+                "confidence": _get_confidence_level(count)
+            }
+    return results
+
+async def get_climate_trends(lat: float, lon: float, location: str, start_year: int = 2014, end_year: int = 2023):
+    async def fetch(first_year: int, last_year: int) -> np.ndarray:
+        start = date(first_year, 1, 1)
+        end = min(date(last_year, 12, 31), date.today())
+        if start > end:
+            return np.zeros((0, len(trend_store.FIELDS)))
+        columns = await _fetch_daily_series(lat, lon, TREND_PARAMETERS, start, end)
+        return _yearly_sums(columns, start, end)
 
-def get_climate_trends(lat: float, lon: float, location: str, start_year: int = 2014, end_year: int = 2023):
     yearly_data = []
-    
-    for year in range(start_year, end_year + 1):
+    temperature = precipitation = trend_store.LeastSquares()
+    if start_year <= min(end_year, date.today().year):
         try:
-            params = {
-                "parameters": "T2M,PRECTOTCORR,WS10M",
-                "community": "RE",
-                "longitude": lon,
-                "latitude": lat,
-                "start": f"{year}0101",
-                "end": f"{year}1231",
-                "format": "JSON"
-            }
-            
-            response = requests.get(
-                "https://power.larc.nasa.gov/api/temporal/daily/point",
-                params=params,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            props = data["properties"]["parameter"]
-            
-            year_temps = [v for v in props["T2M"].values() if v != -999]
-            year_precip = [v for v in props["PRECTOTCORR"].values() if v != -999]
-            
-            extreme_heat_days = len([t for t in year_temps if t > 32])
-            extreme_cold_days = len([t for t in year_temps if t < 5])
-            heavy_rain_days = len([p for p in year_precip if p > 10])
-            
-            yearly_data.append({
-                "year": year,
-                "avg_temp": float(np.mean(year_temps)) if year_temps else None,
-                "total_precip": float(np.sum(year_precip)) if year_precip else None,
-                "extreme_heat_days": extreme_heat_days,
-                "extreme_cold_days": extreme_cold_days,
-                "heavy_rain_days": heavy_rain_days
-            })
-        except:
-            continue
+            span = await resilience.within_deadline(trend_store.load_span(power_cache.grid_cell(lat, lon), start_year, end_year, fetch))
+            yearly_data = span.yearly_data()
+            temperature, precipitation = span.temperature, span.precipitation
+        except (httpx.HTTPError, resilience.UpstreamUnavailable, KeyError, ValueError) as e:
+            print(f"NASA POWER Trends Error: {e}")
     
-    if len(yearly_data) < 3:
+    complete_years = [d for d in yearly_data if not d["partial"]]
+    if len(complete_years) < 3:
         return {
             "trend_direction": "insufficient_data",
             "temperature_trend": 0,
@@ -211,19 +492,8 @@ def get_climate_trends(lat: float, lon: float, location: str, start_year: int =
             "yearly_data": yearly_data
         }
     
-    years = [d["year"] for d in yearly_data if d["avg_temp"] is not None]
-    temps = [d["avg_temp"] for d in yearly_data if d["avg_temp"] is not None]
-    
-    if len(years) >= 3:
-        temp_trend = np.polyfit(years, temps, 1)[0]
-    else:
-        temp_trend = 0
-    
-    precip_data = [d["total_precip"] for d in yearly_data if d["total_precip"] is not None]
-    if len(precip_data) >= 3:
-        precip_trend = np.polyfit(range(len(precip_data)), precip_data, 1)[0]
-    else:
-        precip_trend = 0
+    temp_trend = temperature.slope() if temperature.n >= 3 else 0
+    precip_trend = precipitation.slope() if precipitation.n >= 3 else 0
     
     return {
         "trend_direction": "increasing" if temp_trend > 0 else "decreasing",
@@ -232,16 +502,48 @@ def get_climate_trends(lat: float, lon: float, location: str, start_year: int =
         "yearly_data": yearly_data,
         "analysis": {
             "temp_change_per_decade": float(temp_trend * 10),
-            "increasing_extreme_events": sum([d["extreme_heat_days"] for d in yearly_data[-3:]]) > sum([d["extreme_heat_days"] for d in yearly_data[:3]])
+            "increasing_extreme_events": sum([d["extreme_heat_days"] for d in complete_years[-3:]]) > sum([d["extreme_heat_days"] for d in complete_years[:3]])
         }
     }
 
+def _yearly_sums(columns: Dict[str, np.ndarray], start: date, end: date) -> np.ndarray:
+    days = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+    year_index = days.astype("datetime64[Y]").astype(np.int64) - (start.year - 1970)
+    n_years = end.year - start.year + 1
+
+    temps = columns["T2M"].astype(np.float64)
+    precip = columns["PRECTOTCORR"].astype(np.float64)
+    temp_valid = ~np.isnan(temps)
+    precip_valid = ~np.isnan(precip)
+
+    return np.column_stack([
+        np.bincount(year_index[temp_valid], minlength=n_years),
+        np.bincount(year_index[temp_valid], weights=temps[temp_valid], minlength=n_years),
+        np.bincount(year_index[precip_valid], minlength=n_years),
+        np.bincount(year_index[precip_valid], weights=precip[precip_valid], minlength=n_years),
+        np.bincount(year_index[temp_valid & (np.nan_to_num(temps) > 32)], minlength=n_years),
+        np.bincount(year_index[temp_valid & (np.nan_to_num(temps) < 5)], minlength=n_years),
+        np.bincount(year_index[precip_valid & (np.nan_to_num(precip) > 10)], minlength=n_years)
+    ])
+
+def weather_data_for_export(weather_data: dict) -> dict:
+    export = {key: value for key, value in weather_data.items() if key != "series"}
+    series = weather_data.get("series")
+    export["raw_data"] = series.raw_data() if series is not None else {
+        "temperatures": [],
+        "precipitation": [],
+        "wind": [],
+        "humidity": []
+    }
+    return export
+
 def _get_confidence_level(sample_size: int) -> str:
-    if sample_size >= 1000:
+    scale = (2 * SEASONAL_WINDOW_DAYS + 1) / 365 if SEASONAL_WINDOW_DAYS > 0 else 1.0
+    if sample_size >= 1000 * scale:
         return "HIGH"
-    elif sample_size >= 500:
+    elif sample_size >= 500 * scale:
         return "MEDIUM"
-    elif sample_size >= 100:
+    elif sample_size >= 100 * scale:
         return "LOW"
     else:
         return "VERY_LOW"
@@ -278,10 +580,5 @@ def _get_fallback_data():
                 "90": 25.0
             }
         },
-        "raw_data": {
-            "temperatures": [],
-            "precipitation": [],
-            "wind": [],
-            "humidity": []
-        }
+        "series": None
     }
\ No newline at end of file
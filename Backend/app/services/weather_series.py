@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+RAW_DATA_COLUMNS = {
+    "temperatures": "T2M",
+    "precipitation": "PRECTOTCORR",
+    "wind": "WS10M",
+    "humidity": "RH2M"
+}
+
+def noleap_day_of_year(day: date) -> int:
+    return date(2001, day.month, min(day.day, 28) if day.month == 2 else day.day).timetuple().tm_yday
+
+class WeatherSeries:
+    __slots__ = ("start", "columns", "offsets", "_stats")
+
+    def __init__(self, start: date, columns: Dict[str, np.ndarray], offsets: Optional[np.ndarray] = None):
+        self.start = start
+        self.columns = columns
+        self.offsets = offsets
+        self._stats: dict = {}
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    @property
+    def end(self) -> date:
+        last = int(self.offsets[-1]) if self.offsets is not None and len(self.offsets) else len(self) - 1
+        return self.start + timedelta(days=last)
+
+    @property
+    def dates(self) -> np.ndarray:
+        first = np.datetime64(self.start, "D")
+        if self.offsets is not None:
+            return first + self.offsets.astype("timedelta64[D]")
+        return np.arange(first, first + len(self))
+
+    @property
+    def day_of_year(self) -> np.ndarray:
+        def compute():
+            dates = self.dates
+            years = dates.astype("datetime64[Y]")
+            day = (dates - years).astype(np.int16) + 1
+            year = years.astype(np.int64) + 1970
+            leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+            return day - (leap & (day > 59))
+        return self._cached(("day_of_year",), compute)
+
+    def between(self, start: date, end: date) -> "WeatherSeries":
+        first, last = (start - self.start).days, (end - self.start).days
+        if self.offsets is not None:
+            return self.select((self.offsets >= first) & (self.offsets <= last))
+        lo, hi = max(first, 0), min(last + 1, len(self))
+        columns = {name: column[lo:hi] for name, column in self.columns.items()}
+        return WeatherSeries(self.start + timedelta(days=lo), columns)
+
+    def select(self, mask: np.ndarray) -> "WeatherSeries":
+        offsets = np.flatnonzero(mask) if self.offsets is None else self.offsets[mask]
+        columns = {name: column[mask] for name, column in self.columns.items()}
+        return WeatherSeries(self.start, columns, offsets.astype(np.int32))
+
+    def seasonal_window(self, center: date, half_width: int) -> "WeatherSeries":
+        center_day = noleap_day_of_year(center)
+        distance = np.abs(self.day_of_year - center_day)
+        distance = np.minimum(distance, 365 - distance)
+        return self.select(distance <= half_width)
+
+    def _cached(self, key: tuple, compute):
+        if key not in self._stats:
+            self._stats[key] = compute()
+        return self._stats[key]
+
+    def valid(self, name: str) -> np.ndarray:
+        def compute():
+            column = self.columns.get(name)
+            if column is None:
+                return np.empty(0, dtype=np.float32)
+            return column[~np.isnan(column)]
+        return self._cached(("valid", name), compute)
+
+    def sorted_values(self, name: str) -> np.ndarray:
+        return self._cached(("sorted", name), lambda: np.sort(self.valid(name)))
+
+    def count(self, name: str) -> int:
+        return len(self.valid(name))
+
+    def mean(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        if not self.count(name):
+            return default
+        return self._cached(("mean", name), lambda: float(np.mean(self.valid(name), dtype=np.float64)))
+
+    def std(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        if not self.count(name):
+            return default
+        return self._cached(("std", name), lambda: float(np.std(self.valid(name), dtype=np.float64)))
+
+    def percentiles(self, name: str, levels: Sequence[float], default: Optional[Sequence[float]] = None) -> Optional[List[float]]:
+        if not self.count(name):
+            return None if default is None else list(default)
+        return self._cached(
+            ("percentiles", name, tuple(levels)),
+            lambda: np.percentile(self.valid(name).astype(np.float64), levels).tolist()
+        )
+
+    def raw_data(self) -> Dict[str, List[float]]:
+        return {
+            key: np.round(self.valid(name).astype(np.float64), 2).tolist()
+            for key, name in RAW_DATA_COLUMNS.items()
+        }
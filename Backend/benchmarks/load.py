@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCATIONS = [
+    "Madrid", "Bogotá", "Mexico City", "Buenos Aires", "Paris", "London", "Tokyo", "Sydney",
+    "Cairo", "Nairobi", "Toronto", "Chicago", "Lima", "Berlin", "Mumbai", "Cape Town"
+]
+ACTIVITIES = ["Picnic", "Hiking", "Beach", "Cycling", "Running / Outdoor Sports", "Outdoor Market"]
+
+def _event_date(rng: random.Random) -> str:
+    return str(date(2025, 1, 1) + timedelta(days=rng.randrange(365)))
+
+def _check(rng: random.Random):
+    return "POST", "/api/check", {"activity": rng.choice(ACTIVITIES), "location": rng.choice(LOCATIONS), "date": _event_date(rng)}
+
+def _compare(rng: random.Random):
+    return "POST", "/api/compare", {"activity": rng.choice(ACTIVITIES), "locations": rng.sample(LOCATIONS, rng.randint(2, 5)), "date": _event_date(rng)}
+
+def _trends(rng: random.Random):
+    end_year = rng.randint(2015, 2024)
+    return "GET", f"/api/trends/{rng.choice(LOCATIONS)}?start_year={end_year - 9}&end_year={end_year}", None
+
+def _export_csv(rng: random.Random):
+    return "POST", "/api/export/csv", {"activity": rng.choice(ACTIVITIES), "location": rng.choice(LOCATIONS), "date": _event_date(rng)}
+
+def _export_json(rng: random.Random):
+    return "POST", "/api/export/json", {"activity": rng.choice(ACTIVITIES), "location": rng.choice(LOCATIONS), "date": _event_date(rng)}
+
+def _export_daily(rng: random.Random):
+    return "POST", "/api/export/daily", {
+        "locations": rng.sample(LOCATIONS, rng.randint(1, 3)),
+        "start": "2000-01-01",
+        "end": "2020-12-31",
+        "format": rng.choice(["csv", "ndjson"])
+    }
+
+def _best_dates(rng: random.Random):
+    start = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+    return "POST", "/api/best-dates", {
+        "activity": rng.choice(ACTIVITIES),
+        "location": rng.choice(LOCATIONS),
+        "start": str(start),
+        "end": str(start + timedelta(days=90)),
+        "weekdays": [5]
+    }
+
+def _heatmap(rng: random.Random):
+    south, west = rng.uniform(-40, 50), rng.uniform(-120, 120)
+    return "GET", f"/api/heatmap?south={south:.2f}&west={west:.2f}&north={south + 4:.2f}&east={west + 6:.2f}&date={_event_date(rng)}&activity={rng.choice(ACTIVITIES)}", None
+
+SCENARIOS = {
+    "check": _check,
+    "compare": _compare,
+    "trends": _trends,
+    "export_csv": _export_csv,
+    "export_json": _export_json,
+    "export_daily": _export_daily,
+    "best_dates": _best_dates,
+    "heatmap": _heatmap
+}
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _spawn(args, env=None) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable] + args, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+
+def _wait_until_up(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout} s")
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, requests: int, concurrency: int, seed: int) -> dict:
+    rng = random.Random(f"{scenario}-{seed}-{concurrency}")
+    plan = [SCENARIOS[scenario](rng) for _ in range(requests)]
+    latencies = []
+    errors = 0
+    queue = iter(plan)
+
+    async def worker():
+        nonlocal errors
+        for method, path, body in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    percentile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1],
+        "mean_ms": statistics.fmean(latencies)
+    }
+
+async def run(args, api_url: str) -> list:
+    results = []
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+    async with httpx.AsyncClient(base_url=api_url, timeout=300, limits=limits) as client:
+        for scenario in args.scenario or list(SCENARIOS):
+            if args.warmup:
+                await run_scenario(client, scenario, args.warmup, 8, -args.seed)
+            for concurrency in args.concurrency:
+                result = await run_scenario(client, scenario, args.requests, concurrency, args.seed)
+                results.append(result)
+                print(
+                    f"{scenario:<13} c={concurrency:<4} {result['throughput_rps']:8.1f} req/s  "
+                    f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+                    f"p99 {result['p99_ms']:8.1f} ms  errors {result['errors']}"
+                )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency/throughput scenarios against local NASA POWER and Nominatim stand-ins")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Scenario to run (repeatable, default all)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=0, help="Unmeasured requests per scenario before measuring")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the API")
+    parser.add_argument("--latency-ms", type=float, default=300, help="Stand-in upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--fixtures", help="Recorded responses directory passed to the stand-ins")
+    parser.add_argument("--no-gazetteer", action="store_true", help="Send every geocode to the Nominatim stand-in")
+    parser.add_argument("--no-response-cache", action="store_true", help="Recompute every response")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    stub_port, api_port = _free_port(), _free_port()
+    stub_args = ["-m", "benchmarks.stubs", "--port", str(stub_port), "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms)]
+    if args.fixtures:
+        stub_args += ["--fixtures", args.fixtures]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(
+            os.environ,
+            POWER_DAILY_URL=f"http://127.0.0.1:{stub_port}/api/temporal/daily/point",
+            POWER_REGIONAL_URL=f"http://127.0.0.1:{stub_port}/api/temporal/daily/regional",
+            NOMINATIM_DOMAIN=f"127.0.0.1:{stub_port}",
+            NOMINATIM_SCHEME="http",
+            NOMINATIM_MIN_INTERVAL_SECONDS="0",
+            POWER_CACHE_PATH=os.path.join(cache_dir, "power_cache.sqlite3"),
+            CLIMATOLOGY_DIR=os.path.join(cache_dir, "climatology"),
+            GEOCODE_CACHE_PATH=os.path.join(cache_dir, "geocode_cache.sqlite3"),
+            TRENDS_CACHE_PATH=os.path.join(cache_dir, "trends.sqlite3"),
+            RESPONSE_CACHE_PATH="",
+            PREFETCH_ENABLED="0"
+        )
+        if args.no_gazetteer:
+            env["GAZETTEER_PATH"] = ""
+        if args.no_response_cache:
+            env["RESPONSE_CACHE_SIZE"] = "0"
+
+        processes = [_spawn(stub_args)]
+        try:
+            _wait_until_up(f"http://127.0.0.1:{stub_port}/stats")
+            processes.append(_spawn([
+                "-m", "uvicorn", "app.main:app", "--port", str(api_port),
+                "--workers", str(args.workers), "--log-level", "warning"
+            ], env))
+            _wait_until_up(f"http://127.0.0.1:{api_port}/")
+
+            results = asyncio.run(run(args, f"http://127.0.0.1:{api_port}"))
+            upstream = httpx.get(f"http://127.0.0.1:{stub_port}/stats").json()
+            print(f"upstream calls: {upstream}")
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"arguments": vars(args), "upstream": upstream, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
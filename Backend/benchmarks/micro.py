@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import timeit
+from datetime import date
+
+os.environ.setdefault("POWER_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "power_cache.sqlite3"))
+os.environ.setdefault("CLIMATOLOGY_DIR", os.path.join(tempfile.mkdtemp(), "climatology"))
+
+import httpx
+
+from app.core import scoring
+from app.services import http_client, power_cache, weather_nasa
+from app.services.weather_series import WeatherSeries
+from benchmarks import stubs
+
+EVENT_DATE = date(2025, 7, 12)
+LAT, LON = 40.4168, -3.7038
+
+def bench(name: str, fn, repeat: int):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    unit, scale = ("ms", 1e3) if best >= 1e-3 else ("µs", 1e6)
+    print(f"{name:<58} {best * scale:10.2f} {unit}  ({number} calls x {repeat})")
+
+def power_params(start: date, end: date) -> dict:
+    return {
+        "parameters": ",".join(weather_nasa.DAILY_PARAMETERS),
+        "latitude": LAT,
+        "longitude": LON,
+        "start": start.strftime("%Y%m%d"),
+        "end": end.strftime("%Y%m%d")
+    }
+
+def fetch_nasa_power_data():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=stubs.synthetic_power(dict(request.url.params)))
+
+    async def run():
+        http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            power_cache.clear()
+            return await weather_nasa._get_nasa_power_data(LAT, LON, [EVENT_DATE])
+        finally:
+            await http_client.close()
+
+    return asyncio.run(run())
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for parsing, probabilities and scoring")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    start, end = date(EVENT_DATE.year - args.years, 1, 1), date(EVENT_DATE.year - 1, 12, 31)
+    props = stubs.synthetic_power(power_params(start, end))["properties"]["parameter"]
+    history = WeatherSeries(start, weather_nasa._parse_power_parameters(props, weather_nasa.DAILY_PARAMETERS, start, end))
+    summary = weather_nasa.summarize_weather(weather_nasa._history_for(history, EVENT_DATE))
+    summaries = [
+        weather_nasa.summarize_weather(weather_nasa._history_for(history, date(2025, 1, 1 + i % 28)))
+        for i in range(1000)
+    ]
+    activities = [scoring.ACTIVITIES[i % len(scoring.ACTIVITIES)] for i in range(len(summaries))]
+
+    bench(f"_parse_power_parameters ({args.years} y x {len(props)} params)",
+          lambda: weather_nasa._parse_power_parameters(props, weather_nasa.DAILY_PARAMETERS, start, end), args.repeat)
+    bench("_get_nasa_power_data (cold cache, mocked HTTP)", fetch_nasa_power_data, args.repeat)
+    bench("summarize_weather (seasonal window)",
+          lambda: weather_nasa.summarize_weather(weather_nasa._history_for(history, EVENT_DATE)), args.repeat)
+    for mode in ["empirical", "normal"]:
+        bench(f"calculate_extreme_probabilities ({mode}, fresh series)",
+              lambda: weather_nasa.calculate_extreme_probabilities(
+                  dict(summary, series=weather_nasa._history_for(history, EVENT_DATE)), mode=mode
+              ), args.repeat)
+    bench("calculate_suitability_score", lambda: scoring.calculate_suitability_score(summary, "Hiking"), args.repeat)
+    bench("score_pairs (1000 summaries)", lambda: scoring.score_pairs(summaries, activities), args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ["geopy", "scipy", "pyarrow"]
+
+PROBE = """
+import json, resource, sys, time
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform == "darwin" else 1024
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "rss_mb": peak * scale / 2 ** 20,
+    "rss_delta_mb": (peak - baseline) * scale / 2 ** 20,
+    "loaded": sorted(name for name in {lazy!r} if name in sys.modules)
+}}))
+"""
+
+def probe(module: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def slowest_imports(module: str, limit: int):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stderr
+
+    rows = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time and peak RSS of the API")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports (cumulative)")
+    parser.add_argument("--max-import-ms", type=float, help="Fail if the median import time exceeds this")
+    parser.add_argument("--max-rss-mb", type=float, help="Fail if the median peak RSS exceeds this")
+    args = parser.parse_args()
+
+    samples = [probe(args.module) for _ in range(args.runs)]
+    import_ms = [sample["import_ms"] for sample in samples]
+    rss_mb = [sample["rss_mb"] for sample in samples]
+    rss_delta_mb = [sample["rss_delta_mb"] for sample in samples]
+    loaded = sorted(set().union(*(sample["loaded"] for sample in samples)))
+
+    print(f"{args.module}: {args.runs} cold imports")
+    print(f"  import time  median {statistics.median(import_ms):.1f} ms  (min {min(import_ms):.1f}, max {max(import_ms):.1f})")
+    print(f"  peak RSS     median {statistics.median(rss_mb):.1f} MB  (+{statistics.median(rss_delta_mb):.1f} MB over the bare interpreter)")
+    print(f"  lazy modules loaded at import: {', '.join(loaded) or 'none'}")
+
+    if args.top:
+        print(f"  slowest imports:")
+        for micros, name in slowest_imports(args.module, args.top):
+            print(f"    {micros / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if args.max_import_ms is not None and statistics.median(import_ms) > args.max_import_ms:
+        failures.append(f"import time {statistics.median(import_ms):.1f} ms > {args.max_import_ms} ms")
+    if args.max_rss_mb is not None and statistics.median(rss_mb) > args.max_rss_mb:
+        failures.append(f"peak RSS {statistics.median(rss_mb):.1f} MB > {args.max_rss_mb} MB")
+    if loaded:
+        failures.append(f"{', '.join(loaded)} imported eagerly")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+from datetime import datetime
+
+import numpy as np
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+POWER_PATH = "/api/temporal/daily/point"
+POWER_REGIONAL_PATH = "/api/temporal/daily/regional"
+NATIVE_GRID = (0.5, 0.625)
+POWER_UPSTREAM = "https://power.larc.nasa.gov"
+NOMINATIM_UPSTREAM = "https://nominatim.openstreetmap.org"
+MISSING_VALUE_RATE = 0.01
+
+def power_key(params: dict) -> str:
+    parts = [
+        f"{float(params['latitude']):.4f}",
+        f"{float(params['longitude']):.4f}",
+        params["start"],
+        params["end"],
+        ",".join(sorted(params["parameters"].split(",")))
+    ]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
+
+def synthetic_power(params: dict) -> dict:
+    lat, lon = float(params["latitude"]), float(params["longitude"])
+    start = np.datetime64(datetime.strptime(params["start"], "%Y%m%d").date(), "D")
+    end = np.datetime64(datetime.strptime(params["end"], "%Y%m%d").date(), "D")
+    days = np.arange(start, end + 1)
+    keys = np.datetime_as_string(days, unit="D").astype("U10")
+    keys = np.char.replace(keys, "-", "").tolist()
+
+    ordinal = days.astype(np.int64)
+    season = np.sin((ordinal % 365.25 - 100) / 365.25 * 2 * np.pi) * (1 if lat >= 0 else -1)
+    rng = np.random.default_rng(abs(hash((round(lat, 4), round(lon, 4)))) % 2 ** 32 + int(ordinal[0]))
+    base = 25 - abs(lat) * 0.35 + 10 * season
+
+    generators = {
+        "T2M": lambda: base + rng.normal(0, 2.5, len(days)),
+        "T2M_MAX": lambda: base + 6 + rng.normal(0, 2, len(days)),
+        "T2M_MIN": lambda: base - 6 + rng.normal(0, 2, len(days)),
+        "PRECTOTCORR": lambda: np.maximum(0, rng.gamma(0.6, 3, len(days)) - 0.5),
+        "WS10M": lambda: rng.gamma(3, 1.3, len(days)),
+        "RH2M": lambda: np.clip(65 - 15 * season + rng.normal(0, 10, len(days)), 5, 100),
+        "CLOUD_AMT": lambda: rng.uniform(0, 100, len(days)),
+        "ALLSKY_SFC_UV_INDEX": lambda: np.clip(6 + 4 * season + rng.normal(0, 1, len(days)), 0, 14)
+    }
+
+    parameter = {}
+    for name in params["parameters"].split(","):
+        values = np.round(generators.get(name, lambda: rng.uniform(0, 10, len(days)))(), 2)
+        values[rng.random(len(days)) < MISSING_VALUE_RATE] = -999
+        parameter[name] = dict(zip(keys, values.tolist()))
+    return {"properties": {"parameter": parameter}}
+
+def regional_key(params: dict) -> str:
+    return hashlib.sha1("|".join(f"{key}={params[key]}" for key in sorted(params)).encode()).hexdigest()[:20]
+
+def synthetic_region(params: dict) -> dict:
+    axes = []
+    for name, step in zip(["latitude", "longitude"], NATIVE_GRID):
+        low, high = float(params[f"{name}-min"]), float(params[f"{name}-max"])
+        axes.append(np.arange(np.ceil(low / step), np.floor(high / step) + 1) * step)
+
+    features = []
+    for lat in axes[0].tolist():
+        for lon in axes[1].tolist():
+            point = synthetic_power(dict(params, latitude=lat, longitude=lon))
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat, 0.0]},
+                "properties": point["properties"]
+            })
+    return {"type": "FeatureCollection", "features": features}
+
+def synthetic_place(query: str) -> list:
+    digest = hashlib.sha1(query.strip().lower().encode()).digest()
+    lat = int.from_bytes(digest[:4], "big") / 2 ** 32 * 130 - 60
+    lon = int.from_bytes(digest[4:8], "big") / 2 ** 32 * 360 - 180
+    return [{"lat": f"{lat:.7f}", "lon": f"{lon:.7f}", "display_name": query, "importance": 0.5}]
+
+def create_app(latency_ms: float = 0, jitter_ms: float = 0, fixtures_dir: str = FIXTURES_DIR, record: bool = False):
+    import httpx
+    from fastapi import FastAPI, Request, Response
+
+    app = FastAPI(title="NASA POWER / Nominatim stand-in")
+    counters = {"power": 0, "power_replayed": 0, "regional": 0, "regional_replayed": 0, "geocode": 0, "geocode_replayed": 0}
+    geocode_path = os.path.join(fixtures_dir, "geocode.json")
+    places = {}
+    if os.path.exists(geocode_path):
+        with open(geocode_path) as f:
+            places = json.load(f)
+
+    async def delay():
+        seconds = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+        if seconds:
+            await asyncio.sleep(seconds)
+
+    @app.get(POWER_PATH)
+    async def power(request: Request):
+        counters["power"] += 1
+        params = dict(request.query_params)
+        path = os.path.join(fixtures_dir, "power", power_key(params) + ".json")
+        await delay()
+
+        if os.path.exists(path):
+            counters["power_replayed"] += 1
+            with open(path, "rb") as f:
+                return Response(f.read(), media_type="application/json")
+
+        if record:
+            async with httpx.AsyncClient(timeout=60) as client:
+                response = await client.get(POWER_UPSTREAM + POWER_PATH, params=params)
+                response.raise_for_status()
+                payload = response.json()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(payload, f)
+            return payload
+
+        return Response(json.dumps(synthetic_power(params)), media_type="application/json")
+
+    @app.get(POWER_REGIONAL_PATH)
+    async def regional(request: Request):
+        counters["regional"] += 1
+        params = dict(request.query_params)
+        path = os.path.join(fixtures_dir, "regional", regional_key(params) + ".json")
+        await delay()
+
+        if os.path.exists(path):
+            counters["regional_replayed"] += 1
+            with open(path, "rb") as f:
+                return Response(f.read(), media_type="application/json")
+
+        if record:
+            async with httpx.AsyncClient(timeout=120) as client:
+                response = await client.get(POWER_UPSTREAM + POWER_REGIONAL_PATH, params=params)
+                response.raise_for_status()
+                payload = response.json()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(payload, f)
+            return payload
+
+        return Response(json.dumps(synthetic_region(params)), media_type="application/json")
+
+    @app.get("/search")
+    async def search(q: str):
+        counters["geocode"] += 1
+        key = q.strip().lower()
+        await delay()
+
+        if key in places:
+            counters["geocode_replayed"] += 1
+            return places[key]
+
+        if record:
+            async with httpx.AsyncClient(timeout=30, headers={"User-Agent": "will_it_rain_on_my_parade_v1"}) as client:
+                response = await client.get(NOMINATIM_UPSTREAM + "/search", params={"q": q, "format": "json", "limit": 1})
+                response.raise_for_status()
+                places[key] = response.json()
+            os.makedirs(fixtures_dir, exist_ok=True)
+            with open(geocode_path, "w") as f:
+                json.dump(places, f, indent=1, ensure_ascii=False)
+            return places[key]
+
+        return synthetic_place(q)
+
+    @app.get("/stats")
+    async def stats():
+        return counters
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-ins for NASA POWER and Nominatim")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory with recorded responses")
+    parser.add_argument("--record", action="store_true", help="Forward misses to the real services and save the responses")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(
+        create_app(args.latency_ms, args.jitter_ms, args.fixtures, args.record),
+        host=args.host,
+        port=args.port,
+        log_level="warning"
+    )
+
+if __name__ == "__main__":
+    main()
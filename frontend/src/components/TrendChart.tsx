@@ -28,10 +28,14 @@ export default function TrendChart({ trends }: TrendChartProps) {
     <div className="bg-white rounded-xl shadow-sm border border-gray-200 p-6">
       <div className="mb-4">
         <h3 className="text-lg font-semibold text-gray-900">Climate Trends Analysis</h3>
-        <p className="text-sm text-gray-600 mt-1">
-          Temperature trend: {trends.temperature_trend > 0 ? '📈' : '📉'} {Math.abs(trends.analysis.temp_change_per_decade).toFixed(2)}°C per decade
-        </p>
-        {trends.analysis.increasing_extreme_events && (
+        {trends.analysis ? (
+          <p className="text-sm text-gray-600 mt-1">
+            Temperature trend: {trends.temperature_trend > 0 ? '📈' : '📉'} {Math.abs(trends.analysis.temp_change_per_decade).toFixed(2)}°C per decade
+          </p>
+        ) : (
+          <p className="text-sm text-gray-600 mt-1">Not enough data to compute a trend</p>
+        )}
+        {trends.analysis?.increasing_extreme_events && (
           <p className="text-sm text-orange-600 mt-1">⚠️ Increasing extreme weather events detected</p>
         )}
       </div>
@@ -5,19 +5,21 @@ import {
   ExtremeProbabilities,
   ClimateTrendsResponse,
   LocationComparisonRequest,
-  ComparisonResponse
+  ComparisonResponse,
+  HeatmapRequest,
+  HeatmapGrid
 } from '@/types/weather';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
 
 export const weatherApi = {
   checkWeather: async (data: CheckRequest): Promise<CheckResponse> => {
-    const response = await axios.post<CheckResponse>(`${API_BASE_URL}/check`, data);
+    const response = await axios.get<CheckResponse>(`${API_BASE_URL}/check`, { params: data });
     return response.data;
   },
 
   getProbabilities: async (data: CheckRequest): Promise<ExtremeProbabilities> => {
-    const response = await axios.post<ExtremeProbabilities>(`${API_BASE_URL}/probabilities`, data);
+    const response = await axios.get<ExtremeProbabilities>(`${API_BASE_URL}/probabilities`, { params: data });
     return response.data;
   },
 
@@ -37,6 +39,22 @@ export const weatherApi = {
     return response.data;
   },
 
+  getHeatmap: async (data: HeatmapRequest): Promise<HeatmapGrid> => {
+    const response = await axios.get<ArrayBuffer>(`${API_BASE_URL}/heatmap`, {
+      params: data,
+      responseType: 'arraybuffer',
+    });
+    return {
+      north: Number(response.headers['x-grid-north']),
+      west: Number(response.headers['x-grid-west']),
+      lat_resolution: Number(response.headers['x-grid-lat-resolution']),
+      lon_resolution: Number(response.headers['x-grid-lon-resolution']),
+      rows: Number(response.headers['x-grid-rows']),
+      cols: Number(response.headers['x-grid-cols']),
+      scores: new Uint8Array(response.data),
+    };
+  },
+
   exportCSV: async (data: CheckRequest): Promise<Blob> => {
     const response = await axios.post(`${API_BASE_URL}/export/csv`, data, {
       responseType: 'blob',
@@ -40,6 +40,7 @@ export interface WeatherData {
   avg_cloud_cover_percent: number;
   avg_uv_index: number;
   data_source: string;
+  stale?: boolean;
   years_analyzed: number;
   temperature_distribution: TemperatureDistribution;
 }
@@ -61,6 +62,7 @@ export interface TrendData {
   extreme_heat_days: number;
   extreme_cold_days: number;
   heavy_rain_days: number;
+  partial?: boolean;
 }
 
 export interface TrendAnalysis {
@@ -73,7 +75,7 @@ export interface ClimateTrendsResponse {
   temperature_trend: number;
   precipitation_trend: number;
   yearly_data: TrendData[];
-  analysis: TrendAnalysis;
+  analysis?: TrendAnalysis | null;
 }
 
 export interface LocationData {
@@ -94,4 +96,22 @@ export interface LocationComparisonRequest {
   locations: string[];
   date: string;
   activity: string;
-}
\ No newline at end of file
+}
+export interface HeatmapRequest {
+  south: number;
+  west: number;
+  north: number;
+  east: number;
+  date: string;
+  activity: string;
+}
+
+export interface HeatmapGrid {
+  north: number;
+  west: number;
+  lat_resolution: number;
+  lon_resolution: number;
+  rows: number;
+  cols: number;
+  scores: Uint8Array;
+}